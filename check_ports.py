@@ -2,41 +2,103 @@
 Check which COM ports are available and which are in use
 """
 
-import serial.tools.list_ports
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-print("="*60)
-print("COM PORT STATUS CHECK")
-print("="*60)
+import serial
 
-ports = serial.tools.list_ports.comports()
+import ports_cache
+from console_out import Out
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _kernel32.CreateFileW.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    ]
+    _kernel32.CreateFileW.restype = wintypes.HANDLE
+    _kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    _OPEN_EXISTING = 3
+    _ERROR_ACCESS_DENIED = 5
+    _ERROR_SHARING_VIOLATION = 32
+    _INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+
+def _is_locked(device: str) -> bool:
+    """
+    Check whether another program holds the COM port (Windows only)
+
+    Uses a query-only CreateFileW (no read/write access requested), which
+    skips the DCB/baud rate setup a full serial.Serial open performs.
+    Raises OSError for failures other than the port being in use.
+    """
+    handle = _kernel32.CreateFileW(
+        f"\\\\.\\{device}", 0, 0, None, _OPEN_EXISTING, 0, None
+    )
+    if handle == _INVALID_HANDLE_VALUE:
+        error = ctypes.get_last_error()
+        if error in (_ERROR_ACCESS_DENIED, _ERROR_SHARING_VIOLATION):
+            return True
+        raise ctypes.WinError(error)
+    _kernel32.CloseHandle(handle)
+    return False
+
+
+def probe(port):
+    """Try to open the port and return (port, status string)"""
+    if sys.platform == 'win32':
+        try:
+            if _is_locked(port.device):
+                return port, "IN USE (locked by another program)"
+            return port, "AVAILABLE (not in use)"
+        except OSError as e:
+            return port, f"ERROR - {e}"
+    
+    try:
+        # A non-blocking open is enough to detect a lock held elsewhere
+        test = serial.Serial(port.device, 9600, timeout=0)
+        test.close()
+        return port, "AVAILABLE (not in use)"
+    except serial.SerialException as e:
+        if "PermissionError" in str(e) or "Acceso denegado" in str(e):
+            return port, "IN USE (locked by another program)"
+        return port, f"ERROR - {e}"
+
+
+out = Out()
+
+out.p("="*60)
+out.p("COM PORT STATUS CHECK")
+out.p("="*60)
+out.flush()
+
+ports = ports_cache.get_comports()
 
 if not ports:
-    print("\nNo COM ports found!")
+    out.p("\nNo COM ports found!")
 else:
-    print(f"\nFound {len(ports)} COM port(s):\n")
+    out.p(f"\nFound {len(ports)} COM port(s):\n")
+    out.flush()
     
-    for port in ports:
-        print(f"Port: {port.device}")
-        print(f"  Description: {port.description}")
-        print(f"  Hardware ID: {port.hwid}")
-        
-        # Try to open the port
-        try:
-            import serial
-            test = serial.Serial(port.device, 9600, timeout=0.5)
-            test.close()
-            print(f"  Status: AVAILABLE (not in use)")
-        except serial.SerialException as e:
-            if "PermissionError" in str(e) or "Acceso denegado" in str(e):
-                print(f"  Status: IN USE (locked by another program)")
-            else:
-                print(f"  Status: ERROR - {e}")
-        
-        print()
-
-print("="*60)
-print("\nTo free up a port:")
-print("1. Close Arduino IDE Serial Monitor")
-print("2. Stop any running Python scripts")
-print("3. Close any serial terminal programs")
-print("="*60)
+    with ThreadPoolExecutor(max_workers=min(16, len(ports))) as executor:
+        results = list(executor.map(probe, ports))
+    
+    for port, status in results:
+        out.p(f"Port: {port.device}")
+        out.p(f"  Description: {port.description}")
+        out.p(f"  Hardware ID: {port.hwid}")
+        out.p(f"  Status: {status}")
+        out.p()
+        out.flush()
+
+out.p("="*60)
+out.p("\nTo free up a port:")
+out.p("1. Close Arduino IDE Serial Monitor")
+out.p("2. Stop any running Python scripts")
+out.p("3. Close any serial terminal programs")
+out.p("="*60)
+out.flush()
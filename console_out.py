@@ -0,0 +1,23 @@
+"""
+Buffered console output for the diagnostic scripts
+
+Each print() on a Windows console is a separate WriteConsoleW call, so the
+scripts collect a section's lines here and write them out in one go.
+"""
+
+import sys
+
+
+class Out:
+    """Collects lines and writes them to stdout in a single call"""
+
+    def __init__(self):
+        self.buf = []
+
+    def p(self, s=''):
+        self.buf.append(f"{s}\n")
+
+    def flush(self):
+        sys.stdout.write(''.join(self.buf))
+        sys.stdout.flush()
+        self.buf.clear()
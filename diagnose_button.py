@@ -4,101 +4,219 @@ This script helps diagnose why button presses aren't being detected
 
 Steps:
 1. Lists all available COM ports
-2. Tests connection to COM7
-3. Reads raw serial data from COM7
+2. Tests connection to COM7 (and COM4 if present)
+3. Reads raw serial data from all tested ports at once
 4. Shows what the button adapter would see
 """
 
 import serial
-import serial.tools.list_ports
+from serial.threaded import Packetizer, ReaderThread
+import ports_cache
+from console_out import Out
+import os
+import queue
+import re
+import selectors
 import time
 import sys
 import io
 
+# Button-related keywords, matched directly against raw serial bytes
+_BTN_RE = re.compile(rb'button|pressed|released', re.I)
+
 # Fix encoding for Windows console
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+# Output is block-buffered; sections flush explicitly so the per-line loop
+# in test_port does not issue a console write for every line
+sys.stdout = io.TextIOWrapper(
+    sys.stdout.buffer,
+    encoding='utf-8',
+    errors='replace',
+    line_buffering=False,
+    write_through=False,
+)
 
 def list_ports():
     """List all available COM ports"""
-    print("\n" + "="*60)
-    print("📋 AVAILABLE COM PORTS")
-    print("="*60)
+    out = Out()
+    out.p("\n" + "="*60)
+    out.p("📋 AVAILABLE COM PORTS")
+    out.p("="*60)
     
-    ports = serial.tools.list_ports.comports()
+    ports = ports_cache.get_comports()
     if not ports:
-        print("❌ No COM ports found!")
+        out.p("❌ No COM ports found!")
+        out.flush()
         return []
     
     for port in ports:
-        print(f"\n🔌 {port.device}")
-        print(f"   Description: {port.description}")
-        print(f"   Hardware ID: {port.hwid}")
+        out.p(f"\n🔌 {port.device}")
+        out.p(f"   Description: {port.description}")
+        out.p(f"   Hardware ID: {port.hwid}")
     
+    out.flush()
     return [port.device for port in ports]
 
-def test_port(port_name, duration=10):
-    """Test reading from a specific port"""
+class _LinePacketizer(Packetizer):
+    """ReaderThread protocol that queues complete lines tagged with the port"""
+    TERMINATOR = b'\n'
+    
+    def __init__(self, port_name, line_queue):
+        super().__init__()
+        self.port_name = port_name
+        self.line_queue = line_queue
+    
+    def handle_packet(self, packet):
+        self.line_queue.put((self.port_name, bytes(packet)))
+
+
+def _iter_line_batches(ports, duration):
+    """
+    Yield lists of (port_name, raw_line) received from all ports
+    
+    On POSIX a selector blocks on every port's file descriptor in a single
+    thread. pyserial has no selectable handle on Windows, so there each
+    port gets a ReaderThread feeding one shared queue.
+    """
+    deadline = time.time() + duration
+    
+    if os.name == 'posix':
+        sel = selectors.DefaultSelector()
+        buffers = {}
+        for name, ser in ports.items():
+            sel.register(ser.fileno(), selectors.EVENT_READ, name)
+            buffers[name] = bytearray()
+        try:
+            while (remaining := deadline - time.time()) > 0:
+                batch = []
+                for key, _ in sel.select(timeout=remaining):
+                    name = key.data
+                    ser = ports[name]
+                    buf = buffers[name]
+                    buf.extend(ser.read(ser.in_waiting or 1))
+                    
+                    # Drain every complete line from the buffer in place
+                    while (nl := buf.find(b'\n')) != -1:
+                        batch.append((name, bytes(buf[:nl])))
+                        del buf[:nl + 1]
+                if batch:
+                    yield batch
+        finally:
+            sel.close()
+        return
+    
+    line_queue = queue.Queue()
+    readers = []
+    for name, ser in ports.items():
+        reader = ReaderThread(
+            ser, lambda name=name: _LinePacketizer(name, line_queue)
+        )
+        reader.start()
+        readers.append(reader)
+    try:
+        while (remaining := deadline - time.time()) > 0:
+            try:
+                batch = [line_queue.get(timeout=remaining)]
+            except queue.Empty:
+                break
+            while True:
+                try:
+                    batch.append(line_queue.get_nowait())
+                except queue.Empty:
+                    break
+            yield batch
+    finally:
+        # stop() leaves the ports open so they stay cached in ports_cache
+        for reader in readers:
+            reader.stop()
+
+
+def test_port(port_names, duration=10):
+    """Test reading from one or more ports at the same time"""
+    if isinstance(port_names, str):
+        port_names = [port_names]
+    
     print("\n" + "="*60)
-    print(f"🔍 TESTING {port_name}")
+    print(f"🔍 TESTING {', '.join(port_names)}")
     print("="*60)
     
+    ports = {}
+    any_fresh = False
+    for port_name in port_names:
+        try:
+            print(f"\nConnecting to {port_name} at 9600 baud...")
+            ser, fresh = ports_cache.get_port(port_name, 9600, timeout=0.1)
+            if not fresh:
+                ser.reset_input_buffer()
+            any_fresh = any_fresh or fresh
+            ports[port_name] = ser
+            print(f"✅ Connected to {port_name}")
+        except serial.SerialException as e:
+            print(f"\n❌ ERROR: Could not open {port_name}")
+            print(f"Details: {e}")
+            print("\nPossible issues:")
+            print("  1. Port is already in use by another program")
+            print("  2. Arduino is not connected to this port")
+            print("  3. Permission denied (try running as admin)")
+    
+    if not ports:
+        sys.stdout.flush()
+        return False
+    
     try:
-        print(f"\nConnecting to {port_name} at 9600 baud...")
-        ser = serial.Serial(port_name, 9600, timeout=1)
-        
-        print("Waiting for Arduino to initialize (2 seconds)...")
-        time.sleep(2)
+        # One reset wait covers every port opened above
+        if any_fresh:
+            print("\nWaiting for Arduino to initialize (2 seconds)...")
+            sys.stdout.flush()
+            time.sleep(2)
         
-        print(f"\n✅ Connected to {port_name}")
-        print("="*60)
+        print("\n" + "="*60)
         print("📡 LISTENING FOR DATA...")
         print("Press the button on your Arduino")
         print(f"Will listen for {duration} seconds")
         print("="*60)
         print()
+        sys.stdout.flush()
         
-        start_time = time.time()
         line_count = 0
+        port_counts = dict.fromkeys(ports, 0)
         
-        while time.time() - start_time < duration:
-            if ser.in_waiting > 0:
+        for batch in _iter_line_batches(ports, duration):
+            for port_name, raw_line in batch:
                 try:
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
+                    line = raw_line.decode('utf-8', errors='ignore').strip()
                     if line:
                         line_count += 1
-                        print(f"[{line_count}] 📨 {line}")
+                        port_counts[port_name] += 1
+                        print(f"[{line_count}] 📨 [{port_name}] {line}")
                         
                         # Check for button-related keywords
-                        if any(keyword in line.lower() for keyword in ['button', 'pressed', 'released']):
+                        if _BTN_RE.search(raw_line):
                             print("     ⭐ BUTTON EVENT DETECTED!")
                 except Exception as e:
                     print(f"     ⚠️  Error decoding: {e}")
             
-            time.sleep(0.01)
-        
-        ser.close()
+            # One console write per batch of received lines
+            sys.stdout.flush()
         
         print("\n" + "="*60)
+        for port_name, count in port_counts.items():
+            if count == 0:
+                print(f"❌ NO DATA RECEIVED on {port_name}")
+            else:
+                print(f"✅ Received {count} lines of data on {port_name}")
         if line_count == 0:
-            print("❌ NO DATA RECEIVED")
             print("\nPossible issues:")
             print("  1. Arduino not programmed with button code")
             print("  2. Wrong COM port")
             print("  3. Arduino not powered/connected")
             print("  4. Baud rate mismatch")
-        else:
-            print(f"✅ Received {line_count} lines of data")
         print("="*60)
+        sys.stdout.flush()
         
         return line_count > 0
         
     except serial.SerialException as e:
-        print(f"\n❌ ERROR: Could not open {port_name}")
-        print(f"Details: {e}")
-        print("\nPossible issues:")
-        print("  1. Port is already in use by another program")
-        print("  2. Arduino is not connected to this port")
-        print("  3. Permission denied (try running as admin)")
+        print(f"\n❌ ERROR while reading: {e}")
         return False
     except Exception as e:
         print(f"\n❌ UNEXPECTED ERROR: {e}")
@@ -116,10 +234,11 @@ def main():
         print("\n❌ No COM ports found. Is your Arduino connected?")
         return
     
-    # Step 2: Test COM7 specifically
-    if "COM7" in available_ports:
-        print("\n✅ COM7 is available")
-        test_port("COM7", duration=15)
+    # Step 2: Test the Arduino ports (COM7 Stage 1, COM4 Stage 2) together
+    arduino_ports = [p for p in ("COM7", "COM4") if p in available_ports]
+    if "COM7" in arduino_ports:
+        print(f"\n✅ {' and '.join(arduino_ports)} available")
+        test_port(arduino_ports, duration=15)
     else:
         print("\n❌ COM7 not found in available ports!")
         print("\nAvailable ports:", ", ".join(available_ports))
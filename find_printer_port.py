@@ -1,38 +1,45 @@
 """
 Quick script to find the thermal printer COM port
 """
-import serial.tools.list_ports
+import re
 
-print("="*60)
-print("🔍 Scanning for COM ports...")
-print("="*60)
+import ports_cache
+from console_out import Out
 
-ports = serial.tools.list_ports.comports()
+_PRINTER_RE = re.compile(r'printer|thermal|pos|usb-serial|ch340|cp210|ftdi', re.I)
+
+out = Out()
+
+out.p("="*60)
+out.p("🔍 Scanning for COM ports...")
+out.p("="*60)
+
+ports = ports_cache.get_comports()
 
 if not ports:
-    print("\n❌ No COM ports found!")
+    out.p("\n❌ No COM ports found!")
 else:
-    print(f"\n✅ Found {len(ports)} COM port(s):\n")
+    out.p(f"\n✅ Found {len(ports)} COM port(s):\n")
     
     for i, port in enumerate(ports, 1):
-        print(f"{i}. {port.device}")
-        print(f"   Description: {port.description}")
-        print(f"   Hardware ID: {port.hwid}")
+        out.p(f"{i}. {port.device}")
+        out.p(f"   Description: {port.description}")
+        out.p(f"   Hardware ID: {port.hwid}")
         
         # Check if it might be a printer
-        desc_lower = port.description.lower()
-        if any(keyword in desc_lower for keyword in ['printer', 'thermal', 'pos', 'usb-serial', 'ch340', 'cp210', 'ftdi']):
-            print(f"   ⭐ POSSIBLE PRINTER!")
+        if _PRINTER_RE.search(port.description):
+            out.p(f"   ⭐ POSSIBLE PRINTER!")
         
         # Check if it's Arduino
         if port.device in ['COM4', 'COM7']:
-            print(f"   🤖 Arduino port (excluded from printer detection)")
+            out.p(f"   🤖 Arduino port (excluded from printer detection)")
         
-        print()
+        out.p()
 
-print("="*60)
-print("\n💡 Tips:")
-print("  • Thermal printers often show as 'USB-Serial' or 'CH340'")
-print("  • COM4 and COM7 are your Arduino ports (excluded)")
-print("  • If you see your printer, note the COM port number")
-print("\n" + "="*60)
+out.p("="*60)
+out.p("\n💡 Tips:")
+out.p("  • Thermal printers often show as 'USB-Serial' or 'CH340'")
+out.p("  • COM4 and COM7 are your Arduino ports (excluded)")
+out.p("  • If you see your printer, note the COM port number")
+out.p("\n" + "="*60)
+out.flush()
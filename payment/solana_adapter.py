@@ -3,38 +3,127 @@ Solana Payment Adapter for IOIO Game
 Handles blockchain interactions, payment verification, and game session management
 """
 import asyncio
+import atexit
 import base64
+import dataclasses
+import functools
 import json
 import logging
-from typing import Optional, Dict, Callable
+import sys
+import threading
+import time
+from typing import Optional, Dict, Callable, TYPE_CHECKING
 from datetime import datetime
 
 from solders.pubkey import Pubkey
-from solders.keypair import Keypair
-from solders.system_program import TransferParams, transfer
-from solders.transaction import Transaction
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
-from solana.rpc.types import TxOpts
-import qrcode
 from io import BytesIO
-import base58
+from urllib.parse import quote
+
+# The RPC client, transaction helpers and qrcode are imported where they are
+# used, so importing this module only pulls in solders.pubkey
+if TYPE_CHECKING:
+    from solana.rpc.async_api import AsyncClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass(slots=True)
+class Session:
+    """State of one pay-to-play game session"""
+    reference: str
+    amount: float
+    created_ns: int  # time.monotonic_ns() at creation
+    paid: bool = False
+    game_started: bool = False
+    score: Optional[int] = None
+    payment_signature: Optional[str] = None
+    completed: bool = False
+    
+    @property
+    def timestamp(self) -> str:
+        """Creation time as an ISO 8601 wall-clock string"""
+        age = (time.monotonic_ns() - self.created_ns) / 1e9
+        return datetime.fromtimestamp(time.time() - age).isoformat()
+
+
+# Single QRCode instance reused between renders (cleared each time)
+_qr = None
+_qr_lock = threading.Lock()
+
+
+def _best_qr_version(sample_url: str) -> int:
+    """Smallest QR version that fits sample_url at error correction L"""
+    import qrcode
+    
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)
+    qr.add_data(sample_url)
+    return qr.best_fit()
+
+
+@functools.lru_cache(maxsize=64)
+def _render_qr(url: str, qr_format: str = 'png', version: Optional[int] = None) -> bytes:
+    """
+    Render a payment URL as a QR code image (memoized by URL and format)
+    
+    'svg' produces a vector path image without rasterizing through PIL;
+    'png' produces the original bitmap. When version is given the size
+    search is skipped, falling back to it only if the URL does not fit.
+    """
+    global _qr
+    import qrcode
+    import qrcode.image.svg
+    from qrcode.exceptions import DataOverflowError
+    
+    with _qr_lock:
+        if _qr is None:
+            _qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+            )
+        qr = _qr
+        qr.clear()
+        qr.add_data(url)
+        if version is None:
+            qr.version = None
+            qr.make(fit=True)
+        else:
+            qr.version = version
+            try:
+                qr.make(fit=False)
+            except DataOverflowError:
+                qr.make(fit=True)
+        
+        # Convert to bytes
+        img_bytes = BytesIO()
+        if qr_format == 'svg':
+            img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+            img.save(img_bytes)
+        else:
+            img = qr.make_image(fill_color="black", back_color="white")
+            img.save(img_bytes, format='PNG')
+        return img_bytes.getvalue()
+
+
 class SolanaGameAdapter:
     """
     Adapter for Solana blockchain integration
     Handles payment verification and game session management
     """
     
+    # RPC clients shared by every adapter using the same endpoint, so a new
+    # adapter reuses the existing HTTP connection pool
+    _client_pool: Dict[str, "AsyncClient"] = {}
+    
     def __init__(
         self,
         rpc_url: str = "https://api.devnet.solana.com",
         program_id: Optional[str] = None,
         ioio_token_mint: Optional[str] = None,
-        game_wallet: Optional[str] = None
+        game_wallet: Optional[str] = None,
+        label: str = "IOIO Game",
+        message: str = "Pay to play!"
     ):
         """
         Initialize Solana adapter
@@ -44,44 +133,105 @@ class SolanaGameAdapter:
             program_id: Deployed program ID (get from Solana Playground)
             ioio_token_mint: IOIO token mint address
             game_wallet: Game's receiving wallet address
+            label: Default payment label
+            message: Default payment message
         """
         self.rpc_url = rpc_url
-        self.client = AsyncClient(rpc_url)
-        self.program_id = Pubkey.from_string(program_id) if program_id else None
-        self.ioio_token_mint = Pubkey.from_string(ioio_token_mint) if ioio_token_mint else None
-        self.game_wallet = Pubkey.from_string(game_wallet) if game_wallet else None
+        self.client = self._get_client(rpc_url)
+        self.set_configuration(program_id, ioio_token_mint, game_wallet)
+        
+        # URL-encoded once; only non-default labels/messages are quoted per call
+        self._default_label = label
+        self._default_message = message
+        self._quoted_label = quote(label)
+        self._quoted_message = quote(message)
         
         # Active game sessions
-        self.active_sessions: Dict[str, Dict] = {}
+        self.active_sessions: Dict[str, Session] = {}
         
         # Callbacks
         self.payment_callback: Optional[Callable] = None
         
+        # Sessions waiting in monitor_payment, polled together by one task
+        self._monitored: set = set()
+        self._payment_events: Dict[str, asyncio.Event] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._poll_wakeup = asyncio.Event()
+        
         logger.info(f"Solana adapter initialized (RPC: {rpc_url})")
         logger.info(f"Program ID: {program_id}")
         logger.info(f"IOIO Token: {ioio_token_mint}")
     
+    @classmethod
+    def _get_client(cls, rpc_url: str) -> "AsyncClient":
+        """Return the pooled AsyncClient for rpc_url, creating it on first use"""
+        client = cls._client_pool.get(rpc_url)
+        if client is None:
+            from solana.rpc.async_api import AsyncClient
+            client = AsyncClient(rpc_url)
+            cls._client_pool[rpc_url] = client
+        return client
+    
+    @classmethod
+    async def close_all_clients(cls):
+        """Close every pooled RPC client"""
+        clients = list(cls._client_pool.values())
+        cls._client_pool.clear()
+        for client in clients:
+            await client.close()
+    
+    @property
+    def game_wallet(self) -> Optional[Pubkey]:
+        """Game's receiving wallet"""
+        return self._game_wallet
+    
+    @game_wallet.setter
+    def game_wallet(self, wallet: Optional[Pubkey]):
+        # Pubkey.__str__ base58-encodes on every call, so keep the string form
+        self._game_wallet = wallet
+        self._game_wallet_str = str(wallet) if wallet is not None else None
+        self._qr_version = None  # recomputed for the new URL length
+    
+    def set_configuration(
+        self,
+        program_id: Optional[str],
+        ioio_token_mint: Optional[str],
+        game_wallet: Optional[str]
+    ):
+        """
+        Set the blockchain addresses and recompute the configured flag
+        
+        All three addresses are parsed before any is assigned, so an invalid
+        address leaves the previous configuration untouched.
+        """
+        program = Pubkey.from_string(program_id) if program_id else None
+        mint = Pubkey.from_string(ioio_token_mint) if ioio_token_mint else None
+        wallet = Pubkey.from_string(game_wallet) if game_wallet else None
+        
+        self.program_id = program
+        self.ioio_token_mint = mint
+        self.game_wallet = wallet
+        self._configured = all(x is not None for x in (program, mint, wallet))
+    
     def is_configured(self) -> bool:
         """Check if adapter is fully configured"""
-        return all([
-            self.program_id is not None,
-            self.ioio_token_mint is not None,
-            self.game_wallet is not None
-        ])
+        return self._configured
     
     async def generate_payment_request(
         self,
         amount: float = 1.0,
-        label: str = "IOIO Game",
-        message: str = "Pay to play!"
+        label: Optional[str] = None,
+        message: Optional[str] = None,
+        qr_format: str = 'png'
     ) -> tuple[str, str, bytes]:
         """
         Generate Solana Pay payment request with QR code
         
         Args:
             amount: Amount in IOIO tokens
-            label: Payment label
-            message: Payment message
+            label: Payment label (default: the adapter's label)
+            message: Payment message (default: the adapter's message)
+            qr_format: QR image format, 'png' or 'svg'
         
         Returns:
             Tuple of (payment_url, session_id, qr_code_bytes)
@@ -89,6 +239,8 @@ class SolanaGameAdapter:
         if not self.is_configured():
             raise ValueError("Adapter not configured. Set program_id, ioio_token_mint, and game_wallet")
         
+        from solders.keypair import Keypair
+        
         # Generate unique reference for this payment
         reference_keypair = Keypair()
         reference = str(reference_keypair.pubkey())
@@ -96,42 +248,42 @@ class SolanaGameAdapter:
         
         # Create Solana Pay URL for SOL (native token)
         # Format: solana:<recipient>?amount=<amount>&reference=<ref>&label=<label>&message=<msg>
-        from urllib.parse import quote
+        if label is None or label == self._default_label:
+            q_label = self._quoted_label
+        else:
+            q_label = quote(label)
+        if message is None or message == self._default_message:
+            q_message = self._quoted_message
+        else:
+            q_message = quote(message)
         
         payment_url = (
-            f"solana:{self.game_wallet}?"
+            f"solana:{self._game_wallet_str}?"
             f"amount={amount}&"
             f"reference={reference}&"
-            f"label={quote(label)}&"
-            f"message={quote(message)}"
-        )
-        
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+            f"label={q_label}&"
+            f"message={q_message}"
         )
-        qr.add_data(payment_url)
-        qr.make(fit=True)
         
-        # Convert to bytes
-        img = qr.make_image(fill_color="black", back_color="white")
-        img_bytes = BytesIO()
-        img.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        qr_bytes = img_bytes.getvalue()
+        # Generate QR code, sized once for the longest URL this wallet and
+        # the default label/message can produce
+        if self._qr_version is None:
+            sample_url = (
+                f"solana:{self._game_wallet_str}?"
+                f"amount={'9' * 20}&"
+                f"reference={'1' * 44}&"
+                f"label={self._quoted_label}&"
+                f"message={self._quoted_message}"
+            )
+            self._qr_version = _best_qr_version(sample_url)
+        qr_bytes = _render_qr(payment_url, qr_format, self._qr_version)
         
         # Store session
-        self.active_sessions[session_id] = {
-            'reference': reference,
-            'amount': amount,
-            'timestamp': datetime.now().isoformat(),
-            'paid': False,
-            'game_started': False,
-            'score': None
-        }
+        self.active_sessions[session_id] = Session(
+            reference=reference,
+            amount=amount,
+            created_ns=time.monotonic_ns()
+        )
         
         logger.info(f"Payment request generated: {session_id}")
         logger.info(f"Amount: {amount} IOIO")
@@ -156,12 +308,14 @@ class SolanaGameAdapter:
         session = self.active_sessions[session_id]
         
         # If already paid, return True
-        if session['paid']:
+        if session.paid:
             return True
         
+        from solana.rpc.commitment import Confirmed
+        
         try:
             # Get signatures for the reference address
-            reference_pubkey = Pubkey.from_string(session['reference'])
+            reference_pubkey = Pubkey.from_string(session.reference)
             
             response = await self.client.get_signatures_for_address(
                 reference_pubkey,
@@ -170,16 +324,7 @@ class SolanaGameAdapter:
             
             if response.value:
                 # Payment found!
-                session['paid'] = True
-                session['payment_signature'] = str(response.value[0].signature)
-                
-                logger.info(f"✅ Payment confirmed for session: {session_id}")
-                logger.info(f"Signature: {session['payment_signature']}")
-                
-                # Call payment callback if registered
-                if self.payment_callback:
-                    await self.payment_callback(session_id, session)
-                
+                await self._confirm_payment(session_id, str(response.value[0].signature))
                 return True
             
             return False
@@ -188,53 +333,181 @@ class SolanaGameAdapter:
             logger.error(f"Error checking payment: {e}")
             return False
     
+    async def check_payments(self, session_ids: list[str]) -> Dict[str, bool]:
+        """
+        Check several sessions with a single JSON-RPC batch request
+        
+        Args:
+            session_ids: Session IDs (reference pubkeys) to check
+        
+        Returns:
+            Dict mapping each session ID to True if payment confirmed
+        """
+        results: Dict[str, bool] = {}
+        pending = []
+        for session_id in session_ids:
+            session = self.active_sessions.get(session_id)
+            if session is None:
+                logger.warning(f"Session not found: {session_id}")
+                results[session_id] = False
+            elif session.paid:
+                results[session_id] = True
+            else:
+                pending.append(session_id)
+        
+        if not pending:
+            return results
+        
+        from solders.commitment_config import CommitmentLevel
+        from solders.rpc.config import RpcSignaturesForAddressConfig
+        from solders.rpc.requests import GetSignaturesForAddress
+        
+        config = RpcSignaturesForAddressConfig(commitment=CommitmentLevel.Confirmed)
+        reqs = tuple(
+            GetSignaturesForAddress(
+                Pubkey.from_string(self.active_sessions[session_id].reference),
+                config,
+                id=i
+            )
+            for i, session_id in enumerate(pending)
+        )
+        
+        try:
+            raw = await self.client._provider.make_batch_request_unparsed(reqs)
+            # Servers may answer a batch in any order, so match on the request id
+            responses = {item.get('id'): item for item in json.loads(raw)}
+        except Exception as e:
+            logger.error(f"Error checking payments: {e}")
+            results.update(dict.fromkeys(pending, False))
+            return results
+        
+        for i, session_id in enumerate(pending):
+            signatures = (responses.get(i) or {}).get('result') or []
+            if signatures:
+                await self._confirm_payment(session_id, signatures[0]['signature'])
+                results[session_id] = True
+            else:
+                results[session_id] = False
+        
+        return results
+    
+    async def _confirm_payment(self, session_id: str, signature: str):
+        """Record a confirmed payment and notify the payment callback"""
+        session = self.active_sessions[session_id]
+        session.paid = True
+        session.payment_signature = signature
+        
+        logger.info(f"✅ Payment confirmed for session: {session_id}")
+        logger.info(f"Signature: {signature}")
+        
+        # Call payment callback if registered; a failing callback must not
+        # hide the payment from monitor_payment or stop the shared poller
+        if self.payment_callback:
+            try:
+                await self.payment_callback(session_id, session)
+            except Exception as e:
+                logger.error(f"Error in payment callback for session {session_id}: {e}")
+    
     async def monitor_payment(
         self,
         session_id: str,
         timeout: int = 300,
-        check_interval: int = 2
+        check_interval: float = 0.5,
+        max_interval: float = 5.0
     ) -> bool:
         """
         Monitor payment until confirmed or timeout
         
+        All monitored sessions are checked together by one background task
+        using a batch RPC request. The delay between checks starts at
+        check_interval and grows by 1.4x per round up to max_interval; it
+        resets whenever a new session starts being monitored.
+        
         Args:
             session_id: Session ID to monitor
             timeout: Timeout in seconds (default: 5 minutes)
-            check_interval: Check interval in seconds (default: 2 seconds)
+            check_interval: Initial check interval in seconds (default: 0.5 seconds)
+            max_interval: Maximum check interval in seconds (default: 5 seconds)
         
         Returns:
             True if payment confirmed, False if timeout
         """
         logger.info(f"Monitoring payment for session: {session_id}")
-        logger.info(f"Timeout: {timeout}s, Check interval: {check_interval}s")
+        logger.info(f"Timeout: {timeout}s, Check interval: {check_interval}-{max_interval}s")
         
-        elapsed = 0
-        while elapsed < timeout:
-            paid = await self.check_payment(session_id)
-            
-            if paid:
-                return True
-            
-            await asyncio.sleep(check_interval)
-            elapsed += check_interval
-            
-            if elapsed % 10 == 0:  # Log every 10 seconds
-                logger.info(f"Still waiting... ({elapsed}s elapsed)")
+        event = self._payment_events.setdefault(session_id, asyncio.Event())
+        self._monitored.add(session_id)
+        self._poll_wakeup.set()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(
+                self._poll_payments(check_interval, max_interval)
+            )
+        
+        start = time.monotonic()
+        elapsed = 0.0
+        next_log = 10.0
+        try:
+            while elapsed < timeout:
+                wait = min(timeout, next_log) - elapsed
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait)
+                    return True
+                except asyncio.TimeoutError:
+                    elapsed = time.monotonic() - start
+                
+                if elapsed >= next_log:  # Log every 10 seconds
+                    logger.info(f"Still waiting... ({elapsed:.0f}s elapsed)")
+                    next_log += 10.0
+        finally:
+            self._monitored.discard(session_id)
+            self._payment_events.pop(session_id, None)
         
         logger.warning(f"Payment timeout for session: {session_id}")
         return False
     
+    async def _poll_payments(self, check_interval: float, max_interval: float):
+        """Background task: batch-check every monitored session until none remain"""
+        attempt = 0
+        while self._monitored:
+            if self._poll_wakeup.is_set():
+                # A new session joined - poll promptly again
+                self._poll_wakeup.clear()
+                attempt = 0
+            
+            try:
+                results = await self.check_payments(list(self._monitored))
+            except Exception as e:
+                # Keep polling the other sessions; this round counts as unpaid
+                logger.error(f"Error polling payments: {e}")
+                results = {}
+            for session_id, paid in results.items():
+                if paid:
+                    self._monitored.discard(session_id)
+                    event = self._payment_events.get(session_id)
+                    if event is not None:
+                        event.set()
+            
+            if not self._monitored:
+                break
+            
+            delay = min(max_interval, check_interval * 1.4 ** attempt)
+            attempt += 1
+            try:
+                await asyncio.wait_for(self._poll_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    
     def mark_game_started(self, session_id: str) -> bool:
         """Mark game as started for a session"""
         if session_id not in self.active_sessions:
             return False
         
         session = self.active_sessions[session_id]
-        if not session['paid']:
+        if not session.paid:
             logger.warning(f"Cannot start game - payment not confirmed: {session_id}")
             return False
         
-        session['game_started'] = True
+        session.game_started = True
         logger.info(f"Game started for session: {session_id}")
         return True
     
@@ -244,18 +517,25 @@ class SolanaGameAdapter:
             return False
         
         session = self.active_sessions[session_id]
-        if not session['game_started']:
+        if not session.game_started:
             logger.warning(f"Cannot submit score - game not started: {session_id}")
             return False
         
-        session['score'] = score
-        session['completed'] = True
+        session.score = score
+        session.completed = True
         logger.info(f"Score submitted for session {session_id}: {score}")
         return True
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
-        """Get session information"""
-        return self.active_sessions.get(session_id)
+        """Get session information as a plain dict"""
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return None
+        
+        info = dataclasses.asdict(session)
+        del info['created_ns']
+        info['timestamp'] = session.timestamp
+        return info
     
     def register_payment_callback(self, callback: Callable):
         """Register callback to be called when payment is confirmed"""
@@ -263,32 +543,54 @@ class SolanaGameAdapter:
         logger.info("Payment callback registered")
     
     async def close(self):
-        """Close the adapter and cleanup"""
-        await self.client.close()
+        """
+        Close the adapter and cleanup
+        
+        The RPC client is shared with other adapters on the same endpoint and
+        is closed at interpreter exit (or via close_all_clients), not here.
+        """
         logger.info("Solana adapter closed")
 
 
+def _close_client_pool():
+    """atexit hook: close pooled RPC clients"""
+    if not SolanaGameAdapter._client_pool:
+        return
+    try:
+        asyncio.run(SolanaGameAdapter.close_all_clients())
+    except Exception as e:
+        logger.debug(f"Error closing RPC clients: {e}")
+
+
+atexit.register(_close_client_pool)
+
+
 # Example usage and testing
 async def test_adapter():
     """Test the Solana adapter"""
-    print("="*60)
-    print("🧪 Testing Solana Payment Adapter")
-    print("="*60)
+    # Each section is written with a single call to keep console syscalls down
+    def emit(*lines):
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    emit("="*60, "🧪 Testing Solana Payment Adapter", "="*60)
     
     # Initialize adapter (without config for testing)
     adapter = SolanaGameAdapter()
     
-    print(f"\n✅ Adapter initialized")
-    print(f"RPC URL: {adapter.rpc_url}")
-    print(f"Configured: {adapter.is_configured()}")
+    emit(
+        f"\n✅ Adapter initialized",
+        f"RPC URL: {adapter.rpc_url}",
+        f"Configured: {adapter.is_configured()}",
+    )
     
     # Test with mock configuration
-    adapter.program_id = Pubkey.from_string("11111111111111111111111111111111")
-    adapter.ioio_token_mint = Pubkey.from_string("11111111111111111111111111111111")
-    adapter.game_wallet = Pubkey.from_string("11111111111111111111111111111111")
+    adapter.set_configuration(
+        "11111111111111111111111111111111",
+        "11111111111111111111111111111111",
+        "11111111111111111111111111111111"
+    )
     
-    print(f"\n✅ Mock configuration set")
-    print(f"Configured: {adapter.is_configured()}")
+    emit(f"\n✅ Mock configuration set", f"Configured: {adapter.is_configured()}")
     
     # Generate payment request
     try:
@@ -298,23 +600,24 @@ async def test_adapter():
             message="Test payment"
         )
         
-        print(f"\n✅ Payment request generated")
-        print(f"Session ID: {session_id}")
-        print(f"Payment URL: {payment_url[:80]}...")
-        print(f"QR Code size: {len(qr_bytes)} bytes")
-        
         # Get session info
         session_info = adapter.get_session_info(session_id)
-        print(f"\n📊 Session Info:")
-        print(f"  Amount: {session_info['amount']} IOIO")
-        print(f"  Paid: {session_info['paid']}")
-        print(f"  Game Started: {session_info['game_started']}")
+        emit(
+            f"\n✅ Payment request generated",
+            f"Session ID: {session_id}",
+            f"Payment URL: {payment_url[:80]}...",
+            f"QR Code size: {len(qr_bytes)} bytes",
+            f"\n📊 Session Info:",
+            f"  Amount: {session_info['amount']} IOIO",
+            f"  Paid: {session_info['paid']}",
+            f"  Game Started: {session_info['game_started']}",
+        )
         
     except Exception as e:
-        print(f"\n❌ Error: {e}")
+        emit(f"\n❌ Error: {e}")
     
     await adapter.close()
-    print(f"\n✅ Test complete")
+    emit(f"\n✅ Test complete")
 
 
 if __name__ == "__main__":
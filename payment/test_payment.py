@@ -4,10 +4,11 @@ Tests QR code generation and payment monitoring without integrating into main ap
 """
 import asyncio
 import base64
+import threading
+import time
 from flask import Flask, render_template, jsonify, request
 from flask_socketio import SocketIO, emit
 import logging
-from solana_adapter import SolanaGameAdapter
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +22,16 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ioio-test-secret-key'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# One persistent event loop for all adapter coroutines, run in a daemon thread
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+
+
+def run_async(coro):
+    """Run a coroutine on the shared loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
 # Solana adapter (will be configured from web interface)
 solana_adapter = None
 current_session = None
@@ -49,7 +60,11 @@ def configure():
                 'error': 'Missing required fields'
             }), 400
         
-        # Initialize adapter
+        # Deferred so the server starts without loading the Solana stack
+        from solana_adapter import SolanaGameAdapter
+        
+        # Initialize adapter (reconfiguring on the same RPC URL reuses the
+        # pooled client and its open connections)
         solana_adapter = SolanaGameAdapter(
             rpc_url="https://api.devnet.solana.com",
             program_id=program_id,
@@ -89,10 +104,7 @@ def generate_payment():
         amount = float(data.get('amount', 0.001))  # Default to 0.001 SOL for testing
         
         # Generate payment request
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        payment_url, session_id, qr_bytes = loop.run_until_complete(
+        payment_url, session_id, qr_bytes = run_async(
             solana_adapter.generate_payment_request(
                 amount=amount,
                 label="IOIO Game Test",
@@ -130,13 +142,12 @@ def monitor_payment(session_id):
     """Background task to monitor payment"""
     logger.info(f"🔍 Monitoring payment for session: {session_id}")
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     async def check_loop():
         timeout = 300  # 5 minutes
-        elapsed = 0
-        check_interval = 2
+        start = time.monotonic()
+        elapsed = 0.0
+        attempt = 0
+        next_status = 10.0
         
         while elapsed < timeout:
             paid = await solana_adapter.check_payment(session_id)
@@ -147,21 +158,25 @@ def monitor_payment(session_id):
                 # Notify frontend
                 socketio.emit('payment_confirmed', {
                     'session_id': session_id,
-                    'timestamp': solana_adapter.active_sessions[session_id]['timestamp']
+                    'timestamp': solana_adapter.active_sessions[session_id].timestamp
                 })
                 
                 return True
             
-            await asyncio.sleep(check_interval)
-            elapsed += check_interval
+            # Back off from 0.5 s up to 5 s between checks
+            delay = min(5.0, 0.5 * 1.4 ** attempt)
+            await asyncio.sleep(delay)
+            elapsed = time.monotonic() - start
+            attempt += 1
             
             # Send progress update every 10 seconds
-            if elapsed % 10 == 0:
+            if elapsed >= next_status:
                 socketio.emit('payment_status', {
                     'session_id': session_id,
-                    'elapsed': elapsed,
+                    'elapsed': int(elapsed),
                     'status': 'waiting'
                 })
+                next_status += 10.0
         
         # Timeout
         logger.warning(f"⏱️ Payment timeout: {session_id}")
@@ -171,7 +186,7 @@ def monitor_payment(session_id):
         
         return False
     
-    loop.run_until_complete(check_loop())
+    run_async(check_loop())
 
 
 @app.route('/api/session/<session_id>', methods=['GET'])
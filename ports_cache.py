@@ -0,0 +1,183 @@
+"""
+Shared COM port enumeration cache for the diagnostic scripts
+
+check_ports.py, diagnose_button.py and find_printer_port.py all need the
+list of serial ports. On Windows every comports() call walks the whole
+SetupDi / USB device tree, so the result is memoized here for a few seconds
+and the last-seen list is persisted to disk. A fresh process started right
+after another one (e.g. from a launcher) gets the saved list instantly while
+a background thread refreshes it.
+
+Open serial handles are cached here too, so repeated diagnostics in the
+same process reuse the port instead of reopening (and resetting) it.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+import serial
+import serial.tools.list_ports
+
+# How long a snapshot saved by a previous process may be served from disk
+DISK_MAX_AGE = 30.0
+
+_CACHE_DIR = os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/.cache'), 'ioio'
+)
+_CACHE_FILE = os.path.join(_CACHE_DIR, 'ports.json')
+
+_lock = threading.Lock()
+_cache = None  # (timestamp, tuple of ports)
+_refreshing = False
+_open_ports = {}  # (device, baudrate) -> serial.Serial
+
+
+class CachedPort:
+    """Lightweight stand-in for ListPortInfo restored from the disk cache"""
+
+    def __init__(self, device, description='n/a', hwid='n/a', manufacturer=None):
+        self.device = device
+        self.description = description
+        self.hwid = hwid
+        self.manufacturer = manufacturer
+
+    def __repr__(self):
+        return f"CachedPort({self.device!r})"
+
+
+def _enumerate():
+    return tuple(serial.tools.list_ports.comports())
+
+
+def _refresh():
+    global _cache, _refreshing
+    try:
+        ports = _enumerate()
+        with _lock:
+            _cache = (time.time(), ports)
+    finally:
+        _refreshing = False
+
+
+def _load_from_disk():
+    """Return the persisted (timestamp, ports) snapshot, or None"""
+    try:
+        with open(_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        saved_at = float(data['timestamp'])
+        ports = tuple(CachedPort(**entry) for entry in data['ports'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if time.time() - saved_at > DISK_MAX_AGE:
+        return None
+    return saved_at, ports
+
+
+def _save_to_disk():
+    with _lock:
+        snapshot = _cache
+    if snapshot is None:
+        return
+    saved_at, ports = snapshot
+    data = {
+        'timestamp': saved_at,
+        'ports': [
+            {
+                'device': p.device,
+                'description': p.description,
+                'hwid': p.hwid,
+                'manufacturer': p.manufacturer,
+            }
+            for p in ports
+        ],
+    }
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    except OSError:
+        pass
+
+
+def get_comports(max_age=3.0):
+    """
+    Return the available serial ports, reusing a recent enumeration
+
+    Args:
+        max_age: Maximum age in seconds of an in-memory result before
+            comports() is called again
+
+    Returns:
+        Tuple of ListPortInfo (or CachedPort when served from disk)
+    """
+    global _cache, _refreshing
+    with _lock:
+        if _cache is not None and time.time() - _cache[0] < max_age:
+            return _cache[1]
+
+        if _cache is None:
+            preloaded = _load_from_disk()
+            if preloaded is not None:
+                _cache = preloaded
+                if not _refreshing:
+                    _refreshing = True
+                    threading.Thread(target=_refresh, daemon=True).start()
+                return preloaded[1]
+
+    ports = _enumerate()
+    with _lock:
+        _cache = (time.time(), ports)
+    return ports
+
+
+def clear():
+    """Forget the in-memory enumeration"""
+    global _cache
+    with _lock:
+        _cache = None
+
+
+def get_port(device, baudrate=9600, timeout=None):
+    """
+    Return an open serial.Serial for (device, baudrate), reusing a cached one
+
+    The port is opened with DTR low so boards that reset on DTR (Uno,
+    Nano) are not rebooted by the open itself.
+
+    Returns:
+        Tuple of (serial.Serial, True if the port was opened by this call)
+    """
+    key = (device, baudrate)
+    with _lock:
+        ser = _open_ports.get(key)
+        if ser is not None and ser.is_open:
+            if timeout is not None:
+                ser.timeout = timeout
+            return ser, False
+
+        ser = serial.Serial()
+        ser.port = device
+        ser.baudrate = baudrate
+        ser.timeout = timeout
+        ser.dtr = False
+        ser.open()
+        _open_ports[key] = ser
+        return ser, True
+
+
+def close_ports():
+    """Close every cached serial handle"""
+    with _lock:
+        for ser in _open_ports.values():
+            try:
+                ser.close()
+            except Exception:
+                pass
+        _open_ports.clear()
+
+
+atexit.register(_save_to_disk)
+atexit.register(close_ports)
@@ -3,25 +3,17 @@ Run Music-IO with Web Visualizer
 This starts both the music machine and the web visualizer
 """
 import sys
-import os
-from pathlib import Path
+import signal
 import threading
 import time
 import logging
 
-# Add src to Python path
-src_path = Path(__file__).parent / "src"
-sys.path.insert(0, str(src_path))
-
-# Change to src directory
-os.chdir(str(src_path))
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-from app.application import MusicMachineApplication
+from src.app.application import MusicMachineApplication
 
 def run_visualizer(app):
     """Run the web visualizer in a separate thread"""
@@ -53,6 +45,10 @@ def main():
         enable_printer=True   # Thermal printer - auto-detect port
     )
     
+    # Ctrl+C and app.stop() both just set this event
+    shutdown = app.shutdown_event
+    signal.signal(signal.SIGINT, lambda *_: shutdown.set())
+    
     # Initialize visualizer
     if app.visualizer:
         app.visualizer.initialize()
@@ -101,9 +97,13 @@ def main():
         print("Press Ctrl+C to stop")
         print("="*60 + "\n")
         
-        # Keep running
-        while app.is_running():
-            time.sleep(1)
+        # Keep running until Ctrl+C or app.stop(). Lock waits can't be
+        # interrupted by Ctrl+C on Windows, so wake once a second there to
+        # let the SIGINT handler run; elsewhere block with no timeout.
+        wait_timeout = 1.0 if sys.platform == 'win32' else None
+        while not shutdown.wait(wait_timeout):
+            pass
+        print("\n\nShutting down...")
             
     except KeyboardInterrupt:
         print("\n\nShutting down...")
@@ -5,6 +5,8 @@ Tests button reading and verifies game start trigger
 """
 
 import serial
+import selectors
+import sys
 import time
 import json
 
@@ -40,11 +42,29 @@ try:
     button_press_count = 0
     button_release_count = 0
     
+    # strftime only runs when the second changes
+    last_sec = 0
+    timestamp = ""
+    
+    # Sleep in select()/epoll until the port has data. Windows COM handles
+    # can't be registered with a selector, so there readline() blocks instead.
+    sel = None
+    if sys.platform != 'win32':
+        sel = selectors.DefaultSelector()
+        sel.register(ser.fileno(), selectors.EVENT_READ)
+    
     while True:
-        if ser.in_waiting > 0:
-            line = ser.readline().decode('utf-8', errors='ignore').strip()
+        if sel is not None and not sel.select(timeout=1.0):
+            continue
+        
+        raw = ser.readline()
+        if raw:
+            line = raw.decode('utf-8', errors='ignore').strip()
             if line:
-                timestamp = time.strftime("%H:%M:%S")
+                now = int(time.time())
+                if now != last_sec:
+                    timestamp = time.strftime("%H:%M:%S", time.localtime(now))
+                    last_sec = now
                 print(f"[{timestamp}] RAW: {line}")
                 
                 # Try to parse as JSON
@@ -66,8 +86,6 @@ try:
                 
                 print()  # Empty line for readability
         
-        time.sleep(0.01)
-        
 except serial.SerialException as e:
     print(f"\nERROR: Could not open {PORT}")
     print(f"Details: {e}")
@@ -0,0 +1,106 @@
+"""
+Async Serial Support
+Runs serial line readers on one shared asyncio loop instead of a thread per port
+
+Adapters open and prepare their serial.Serial as usual (reset wait, buffer
+flush) and then hand it to open_line_connection(). pyserial-asyncio is
+optional; when it is missing adapters keep their own reader threads.
+"""
+import asyncio
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+try:
+    import serial_asyncio
+    SERIAL_ASYNCIO_AVAILABLE = True
+except ImportError:
+    SERIAL_ASYNCIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+class SerialLineProtocol(asyncio.Protocol):
+    """
+    Splits incoming serial data into lines and hands each one (as bytes)
+    to the owning adapter
+    """
+
+    def __init__(
+        self,
+        handle_line: Callable[[bytes], None],
+        on_lost: Optional[Callable[[Optional[Exception]], None]] = None
+    ):
+        self._handle_line = handle_line
+        self._on_lost = on_lost
+        self._buf = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        buf = self._buf
+        buf += data
+        while (nl := buf.find(b'\n')) >= 0:
+            line = bytes(buf[:nl]).strip()
+            del buf[:nl + 1]
+            if line:
+                try:
+                    self._handle_line(line)
+                except Exception as e:
+                    logger.error(f"Error handling serial line: {e}")
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if self._on_lost:
+            self._on_lost(exc)
+
+
+def start_loop_thread(name: str) -> asyncio.AbstractEventLoop:
+    """Create an event loop and run it forever on a new daemon thread"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name=name, daemon=True).start()
+    return loop
+
+
+def get_serial_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared serial event loop, starting its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = start_loop_thread("serial-io")
+        return _loop
+
+
+def open_line_connection(
+    loop: asyncio.AbstractEventLoop,
+    serial_instance,
+    handle_line: Callable[[bytes], None],
+    on_lost: Optional[Callable[[Optional[Exception]], None]] = None,
+    timeout: float = 5.0
+) -> Tuple[asyncio.Transport, SerialLineProtocol]:
+    """
+    Attach an already-open serial.Serial to the loop
+
+    Can be called from any thread. The transport takes ownership of the
+    port and closes it when the transport is closed.
+
+    Returns:
+        Tuple of (transport, protocol)
+    """
+    coro = serial_asyncio.connection_for_serial(
+        loop,
+        lambda: SerialLineProtocol(handle_line, on_lost),
+        serial_instance
+    )
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def close_transport(loop: asyncio.AbstractEventLoop, transport: Optional[asyncio.Transport]):
+    """Close a transport from outside the loop thread"""
+    if transport is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(transport.close)
@@ -3,3 +3,18 @@ Input Adapters
 Implementations of input ports for various input sources
 """
 # Import handled at runtime
+import functools
+
+import serial.tools.list_ports
+
+
+@functools.lru_cache(maxsize=1)
+def _list_ports() -> tuple:
+    """
+    Enumerate serial ports once for the whole startup
+
+    comports() walks the SetupAPI device tree on Windows, which takes tens
+    to hundreds of ms, and every auto-detecting adapter asks for it.
+    MusicMachineApplication.start() clears the cache when startup is done.
+    """
+    return tuple(serial.tools.list_ports.comports())
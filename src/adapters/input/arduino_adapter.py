@@ -2,19 +2,33 @@
 Arduino Input Adapter
 Connects to Arduino via serial port and receives proximity sensor data
 """
+import asyncio
 import serial
-import serial.tools.list_ports
-import threading
-import time
 import logging
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 import json
 
-from core.ports.input_port import SensorInputPort
-from core.domain.events import ProximityEvent
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+from src.adapters.input import _list_ports
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, close_transport, open_line_connection
+from src.adapters.serial_reader import ReaderThread, start_line_reader
+from src.adapters.serial_open import open_without_reset, set_low_latency
+from src.core.ports.input_port import SensorInputPort
+from src.core.domain.events import ProximityEvent
+
+if TYPE_CHECKING:
+    from src.adapters.input.serial_multiplexer import SerialMultiplexer
 
 logger = logging.getLogger(__name__)
 
+# Lowercase substrings of USB-serial descriptions that identify an Arduino
+_ARDUINO_KEYWORDS = ('arduino', 'ch340', 'usb serial')
+
 
 class ArduinoAdapter(SensorInputPort):
     """
@@ -22,7 +36,14 @@ class ArduinoAdapter(SensorInputPort):
     Communicates via serial port (USB)
     """
     
-    def __init__(self, port: Optional[str] = "COM3", baud_rate: int = 9600, auto_detect: bool = False):
+    def __init__(
+        self,
+        port: Optional[str] = "COM3",
+        baud_rate: int = 9600,
+        auto_detect: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        multiplexer: Optional["SerialMultiplexer"] = None
+    ):
         """
         Initialize Arduino adapter
         
@@ -30,24 +51,34 @@ class ArduinoAdapter(SensorInputPort):
             port: Serial port (e.g., 'COM3' on Windows, '/dev/ttyUSB0' on Linux)
             baud_rate: Serial communication speed (default 9600)
             auto_detect: Automatically detect Arduino port if True
+            loop: Event loop to read the port on (needs pyserial-asyncio);
+                  without one a dedicated reader thread is used
+            multiplexer: Shared reader for a port used by several adapters;
+                         when set the adapter subscribes to its "distance"
+                         messages instead of opening the port itself
         """
         self.port = port
         self.baud_rate = baud_rate
         self.auto_detect = auto_detect
         self.serial_connection: Optional[serial.Serial] = None
         self._running = False
-        self._thread: Optional[threading.Thread] = None
+        self._reader: Optional[ReaderThread] = None
+        self.loop = loop
+        self._transport: Optional[asyncio.Transport] = None
+        self.multiplexer = multiplexer
         self._callback: Optional[Callable[[ProximityEvent], None]] = None
+        self._callback_loop: Optional[asyncio.AbstractEventLoop] = None
         self.sensor_id = "arduino_proximity_01"
         
     def _find_arduino_port(self) -> Optional[str]:
         """Auto-detect Arduino port"""
         logger.info("Searching for Arduino...")
-        ports = serial.tools.list_ports.comports()
+        ports = _list_ports()
         
         for port in ports:
             # Look for common Arduino identifiers
-            if 'Arduino' in port.description or 'CH340' in port.description or 'USB Serial' in port.description:
+            description = port.description.lower()
+            if any(keyword in description for keyword in _ARDUINO_KEYWORDS):
                 logger.info(f"Found potential Arduino at {port.device}: {port.description}")
                 return port.device
         
@@ -64,6 +95,16 @@ class ArduinoAdapter(SensorInputPort):
             logger.warning("Arduino adapter already running")
             return
         
+        if self.multiplexer is not None:
+            # Shared port - the multiplexer owns the connection
+            self.multiplexer.subscribe("distance", self._on_distance_message)
+            self.multiplexer.start()
+            self.port = self.multiplexer.port
+            self.serial_connection = self.multiplexer.serial_connection
+            self._running = True
+            logger.info(f"Arduino adapter subscribed to shared port {self.port}")
+            return
+        
         # Determine port
         if self.auto_detect and not self.port:
             self.port = self._find_arduino_port()
@@ -75,21 +116,32 @@ class ArduinoAdapter(SensorInputPort):
         try:
             # Open serial connection
             logger.info(f"Connecting to Arduino on {self.port} at {self.baud_rate} baud")
-            self.serial_connection = serial.Serial(
-                port=self.port,
-                baudrate=self.baud_rate,
-                timeout=1
+            self.serial_connection = open_without_reset(
+                self.port,
+                self.baud_rate,
+                timeout=1,
+                # Return a burst as soon as the line goes quiet for 20ms
+                inter_byte_timeout=0.02
             )
             
-            # Wait for Arduino to reset (Arduino resets on serial connection)
-            time.sleep(2)
+            # Skip the USB-serial latency timer (Linux) and return buffered
+            # bytes without waiting out the read timeout (Windows)
+            set_low_latency(self.serial_connection)
             
-            # Clear any initial garbage data
+            # The board was not reset by the open; just drop stale bytes
             self.serial_connection.reset_input_buffer()
             
             self._running = True
-            self._thread = threading.Thread(target=self._read_loop, daemon=True)
-            self._thread.start()
+            if self.loop is not None and SERIAL_ASYNCIO_AVAILABLE:
+                # Read on the shared event loop, no thread of our own
+                self._transport, _ = open_line_connection(
+                    self.loop, self.serial_connection,
+                    self._process_data, self._on_connection_lost
+                )
+            else:
+                self._reader = start_line_reader(
+                    self.serial_connection, self._process_data, self._on_connection_lost
+                )
             
             logger.info("Arduino adapter started successfully")
             
@@ -102,11 +154,20 @@ class ArduinoAdapter(SensorInputPort):
         logger.info("Stopping Arduino adapter")
         self._running = False
         
-        if self._thread:
-            self._thread.join(timeout=2)
-        
-        if self.serial_connection and self.serial_connection.is_open:
-            self.serial_connection.close()
+        transport, self._transport = self._transport, None
+        if self.multiplexer is not None:
+            # The port stays open for the other subscribers
+            self.multiplexer.unsubscribe("distance", self._on_distance_message)
+        elif transport is not None:
+            # The transport closes the port on the loop thread
+            close_transport(self.loop, transport)
+        else:
+            reader, self._reader = self._reader, None
+            if reader is not None:
+                # Stops the thread (cancel_read + join) and closes the port
+                reader.close()
+            elif self.serial_connection and self.serial_connection.is_open:
+                self.serial_connection.close()
         
         logger.info("Arduino adapter stopped")
     
@@ -114,61 +175,76 @@ class ArduinoAdapter(SensorInputPort):
         """Check if adapter is running"""
         return self._running
     
-    def register_callback(self, callback: Callable[[ProximityEvent], None]):
-        """Register callback for proximity events"""
+    def register_callback(
+        self,
+        callback: Callable[[ProximityEvent], None],
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        """
+        Register callback for proximity events
+        
+        Args:
+            callback: Function to call for each reading
+            loop: Event loop to run the callback on; by default it runs
+                  directly on the serial reader. Use a loop other than
+                  the one reading the ports, or a slow callback stalls them
+        """
         self._callback = callback
+        self._callback_loop = loop
         logger.info("Callback registered for Arduino adapter")
     
-    def _read_loop(self):
-        """Main loop for reading serial data"""
-        logger.info("Arduino read loop started")
-        
-        while self._running:
-            try:
-                if self.serial_connection and self.serial_connection.in_waiting > 0:
-                    # Read line from Arduino
-                    line = self.serial_connection.readline().decode('utf-8').strip()
-                    
-                    if line:
-                        self._process_data(line)
-                
-                time.sleep(0.01)  # Small delay to prevent CPU spinning
-                
-            except serial.SerialException as e:
-                logger.error(f"Serial communication error: {e}")
-                self._running = False
-            except Exception as e:
-                logger.error(f"Error in read loop: {e}")
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        """Called when the serial transport or reader thread goes away"""
+        if exc is not None:
+            logger.error(f"Serial communication error: {exc}")
+        self._running = False
     
-    def _process_data(self, data: str):
+    def _process_data(self, data: bytes):
         """
         Process incoming data from Arduino
         Expected format: JSON {"distance": 25.5} or plain number "25.5"
+        
+        The raw line is parsed as bytes; both orjson and float() accept
+        bytes, so nothing is decoded on the normal path.
         """
         try:
-            # Try JSON format first
-            try:
-                parsed = json.loads(data)
+            # Only lines that look like a JSON object go to the parser;
+            # everything else is treated as a plain number
+            if data[:1] == b'{':
+                parsed = _loads(data)
                 distance = float(parsed.get('distance', 0))
-            except (json.JSONDecodeError, ValueError):
-                # Fall back to plain number
+            else:
                 distance = float(data)
             
-            if distance > 0:
-                logger.debug(f"Received distance: {distance}cm")
-                
-                # Create proximity event
-                event = ProximityEvent(distance=distance, sensor_id=self.sensor_id)
-                
-                # Call registered callback
-                if self._callback:
-                    self._callback(event)
+            self._emit_distance(distance)
                     
         except ValueError as e:
-            logger.warning(f"Invalid data received: {data} - {e}")
+            logger.warning("Invalid data received: %r - %s", data, e)
         except Exception as e:
             logger.error(f"Error processing data: {e}")
     
+    def _on_distance_message(self, data: dict):
+        """Multiplexer callback for parsed {"distance": ...} messages"""
+        try:
+            self._emit_distance(float(data['distance']))
+        except (TypeError, ValueError) as e:
+            logger.warning("Invalid distance received: %s - %s", data, e)
+    
+    def _emit_distance(self, distance: float):
+        """Turn a distance reading into a ProximityEvent"""
+        if distance > 0:
+            logger.debug("Received distance: %scm", distance)
+            
+            # Create proximity event
+            event = ProximityEvent(distance=distance, sensor_id=self.sensor_id)
+            
+            # Call registered callback
+            if self._callback:
+                if self._callback_loop is not None:
+                    self._callback_loop.call_soon_threadsafe(self._callback, event)
+                else:
+                    self._callback(event)
+    
     def get_sensor_info(self) -> dict:
         """Get sensor information"""
         return {
@@ -2,21 +2,35 @@
 Button Input Adapter
 Reads button press events from Arduino via serial port
 """
+import asyncio
 import logging
 import serial
-import serial.tools.list_ports
 import json
-import threading
-import time
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+from src.adapters.input import _list_ports
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, close_transport, open_line_connection
+from src.adapters.serial_reader import ReaderThread, start_line_reader
+from src.adapters.serial_open import open_without_reset, set_low_latency
 from src.core.ports.input_port import InputPort
 from src.core.domain.events import DomainEvent, EventType
 from dataclasses import dataclass
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from src.adapters.input.serial_multiplexer import SerialMultiplexer
+
 logger = logging.getLogger(__name__)
 
+# Lowercase substrings of USB-serial descriptions that identify an Arduino
+_ARDUINO_KEYWORDS = ('arduino', 'ch340', 'usb serial')
+
 
 @dataclass
 class ButtonEvent(DomainEvent):
@@ -38,7 +52,14 @@ class ButtonAdapter(InputPort):
     Reads button events from serial port and emits ButtonEvent
     """
     
-    def __init__(self, port: str = "COM4", baud_rate: int = 9600, auto_detect: bool = False):
+    def __init__(
+        self,
+        port: str = "COM4",
+        baud_rate: int = 9600,
+        auto_detect: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        multiplexer: Optional["SerialMultiplexer"] = None
+    ):
         """
         Initialize button adapter
         
@@ -46,20 +67,47 @@ class ButtonAdapter(InputPort):
             port: Serial port (e.g., "COM4")
             baud_rate: Baud rate (default 9600)
             auto_detect: Auto-detect Arduino port
+            loop: Event loop to read the port on (needs pyserial-asyncio);
+                  without one a dedicated reader thread is used
+            multiplexer: Shared reader for a port used by several adapters;
+                         when set the adapter subscribes to it instead of
+                         opening the port itself
         """
         self.port = port
         self.baud_rate = baud_rate
         self.auto_detect = auto_detect
         self.serial_connection: Optional[serial.Serial] = None
         self.callback: Optional[Callable] = None
+        self.callback_loop: Optional[asyncio.AbstractEventLoop] = None
         self._running = False
-        self._thread: Optional[threading.Thread] = None
+        self._reader: Optional[ReaderThread] = None
+        self.loop = loop
+        self._transport: Optional[asyncio.Transport] = None
+        self.multiplexer = multiplexer
         
         logger.info(f"Button Adapter initialized on {port} @ {baud_rate} baud")
     
     def start(self):
         """Start reading button events"""
         try:
+            if self.multiplexer is not None:
+                # Shared port - the multiplexer owns the connection. The
+                # first adapter to start it may still pick the port.
+                if self.auto_detect and not self.multiplexer.is_running():
+                    detected_port = self._auto_detect_port()
+                    if detected_port:
+                        self.multiplexer.port = detected_port
+                        logger.info(f"Auto-detected button Arduino on {detected_port}")
+                
+                self.multiplexer.subscribe("button", self._on_button_message)
+                self.multiplexer.subscribe(None, self._on_plain_line)
+                self.multiplexer.start()
+                self.port = self.multiplexer.port
+                self.serial_connection = self.multiplexer.serial_connection
+                self._running = True
+                logger.info(f"Button adapter subscribed to shared port {self.port}")
+                return
+            
             # Auto-detect port if enabled
             if self.auto_detect:
                 detected_port = self._auto_detect_port()
@@ -68,20 +116,30 @@ class ButtonAdapter(InputPort):
                     logger.info(f"Auto-detected button Arduino on {self.port}")
             
             # Open serial connection
-            self.serial_connection = serial.Serial(
-                port=self.port,
-                baudrate=self.baud_rate,
-                timeout=1
+            self.serial_connection = open_without_reset(
+                self.port,
+                self.baud_rate,
+                timeout=1,
+                # Return a burst as soon as the line goes quiet for 20ms
+                inter_byte_timeout=0.02
             )
             logger.info(f"Button Arduino serial connection opened on {self.port} @ {self.baud_rate} baud")
             
-            # Wait for Arduino to initialize
-            time.sleep(2)
+            # Skip the USB-serial latency timer (Linux) and return buffered
+            # bytes without waiting out the read timeout (Windows)
+            set_low_latency(self.serial_connection)
             
-            # Start reading thread
             self._running = True
-            self._thread = threading.Thread(target=self._read_loop, daemon=True)
-            self._thread.start()
+            if self.loop is not None and SERIAL_ASYNCIO_AVAILABLE:
+                # Read on the shared event loop, no thread of our own
+                self._transport, _ = open_line_connection(
+                    self.loop, self.serial_connection,
+                    self._process_line, self._on_connection_lost
+                )
+            else:
+                self._reader = start_line_reader(
+                    self.serial_connection, self._process_line, self._on_connection_lost
+                )
             
             logger.info(f"Button adapter started on {self.port}")
             
@@ -97,11 +155,21 @@ class ButtonAdapter(InputPort):
         logger.info("Stopping button adapter...")
         self._running = False
         
-        if self._thread:
-            self._thread.join(timeout=2)
-        
-        if self.serial_connection and self.serial_connection.is_open:
-            self.serial_connection.close()
+        transport, self._transport = self._transport, None
+        if self.multiplexer is not None:
+            # The port stays open for the other subscribers
+            self.multiplexer.unsubscribe("button", self._on_button_message)
+            self.multiplexer.unsubscribe(None, self._on_plain_line)
+        elif transport is not None:
+            # The transport closes the port on the loop thread
+            close_transport(self.loop, transport)
+        else:
+            reader, self._reader = self._reader, None
+            if reader is not None:
+                # Stops the thread (cancel_read + join) and closes the port
+                reader.close()
+            elif self.serial_connection and self.serial_connection.is_open:
+                self.serial_connection.close()
         
         logger.info("Button adapter stopped")
     
@@ -109,88 +177,115 @@ class ButtonAdapter(InputPort):
         """Check if button adapter is running"""
         return self._running
     
-    def register_callback(self, callback: Callable[[ButtonEvent], None]):
+    def register_callback(
+        self,
+        callback: Callable[[ButtonEvent], None],
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
         """
         Register callback for button events
         
         Args:
             callback: Function to call when button event occurs
+            loop: Event loop to run the callback on; by default it runs
+                  directly on the serial reader. Use a loop other than
+                  the one reading the ports, or a slow callback stalls them
         """
         self.callback = callback
+        self.callback_loop = loop
         logger.info(f"[ButtonAdapter] Callback registered: {callback}")
         logger.info(f"[ButtonAdapter] Callback is now: {self.callback}")
     
-    def _read_loop(self):
-        """Main reading loop (runs in separate thread)"""
-        logger.info("Button reading loop started")
-        
-        while self._running:
-            try:
-                if self.serial_connection and self.serial_connection.in_waiting > 0:
-                    line = self.serial_connection.readline().decode('utf-8').strip()
-                    
-                    if line:
-                        logger.info(f"[ButtonAdapter] Raw serial line: {line}")
-                        self._process_line(line)
-                
-                time.sleep(0.01)  # Small delay to prevent CPU spinning
-                
-            except serial.SerialException as e:
-                logger.error(f"Serial error: {e}")
-                break
-            except Exception as e:
-                logger.error(f"Error in button reading loop: {e}")
-                time.sleep(0.1)
-        
-        logger.info("Button reading loop stopped")
-    
-    def _process_line(self, line: str):
+    def _process_line(self, line: bytes):
         """
         Process a line from serial port
         
         Args:
-            line: JSON string from Arduino
+            line: Raw JSON (or plain text) line from Arduino, as bytes
         """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[ButtonAdapter] Raw serial line: %s", line.decode('utf-8', 'ignore'))
+        
         try:
-            # First, try JSON
-            data = json.loads(line)
-            
-            # Check for button event
-            if "button" in data:
-                button_state = data["button"]
-                logger.info(f"Button state received from Arduino (JSON): {button_state}")
-                
-                # Create and emit event
-                event = ButtonEvent(button_state=button_state)
+            # Skip the parser (and its exception) for lines that can't be JSON,
+            # e.g. boot messages and plain-text debug output
+            if line[:1] == b'{':
+                try:
+                    data = _loads(line)
+                except ValueError:
+                    data = None
                 
-                if self.callback:
-                    self.callback(event)
-                return
+                # Check for button event
+                if data is not None:
+                    if "button" in data:
+                        self._on_button_message(data)
+                    return
             
-        except json.JSONDecodeError:
-            # Fallback: plain text format
-            normalized = line.strip().lower()
-            
-            # Handle various plain text formats
-            if "pressed" in normalized or "button" in normalized:
-                logger.info(f"Button PRESSED detected from Arduino (plain text): {line}")
-                event = ButtonEvent(button_state="pressed")
-                if self.callback:
-                    logger.info(f"[ButtonAdapter] Calling callback with event: {event}")
-                    self.callback(event)
-                    logger.info(f"[ButtonAdapter] Callback executed successfully")
-                else:
-                    logger.warning(f"[ButtonAdapter] No callback registered! Cannot send button event.")
-            elif "released" in normalized:
-                logger.info(f"Button RELEASED detected from Arduino (plain text): {line}")
-                event = ButtonEvent(button_state="released")
-                if self.callback:
-                    self.callback(event)
-            else:
-                logger.debug(f"Non-button line: {line}")
+            self._process_plain_text(line.decode('utf-8', 'ignore'))
         except Exception as e:
             logger.error(f"Error processing button data: {e}")
     
+    def _on_button_message(self, data: dict):
+        """
+        Emit a ButtonEvent for a parsed {"button": ...} message
+        
+        Args:
+            data: Parsed JSON message containing the "button" key
+        """
+        button_state = data["button"]
+        logger.debug("Button state received from Arduino (JSON): %s", button_state)
+        
+        # Create and emit event
+        event = ButtonEvent(button_state=button_state)
+        
+        if self.callback:
+            self._emit(event)
+    
+    def _emit(self, event: ButtonEvent):
+        """Hand an event to the callback, on its loop if one was given"""
+        loop = self.callback_loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self.callback, event)
+        else:
+            self.callback(event)
+    
+    def _on_plain_line(self, line: bytes):
+        """Multiplexer callback for lines that are not JSON"""
+        self._process_plain_text(line.decode('utf-8', 'ignore'))
+    
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        """Called when the serial transport or reader thread goes away"""
+        if exc is not None:
+            logger.error(f"Serial error: {exc}")
+        self._running = False
+    
+    def _process_plain_text(self, line: str):
+        """
+        Fallback for Arduinos that print plain text instead of JSON
+        
+        Args:
+            line: Decoded line from Arduino
+        """
+        normalized = line.lower()
+        
+        # Handle various plain text formats
+        if "pressed" in normalized or "button" in normalized:
+            logger.debug("Button PRESSED detected from Arduino (plain text): %s", line)
+            event = ButtonEvent(button_state="pressed")
+            if self.callback:
+                logger.debug("[ButtonAdapter] Calling callback with event: %s", event)
+                self._emit(event)
+                logger.debug("[ButtonAdapter] Callback executed successfully")
+            else:
+                logger.warning(f"[ButtonAdapter] No callback registered! Cannot send button event.")
+        elif "released" in normalized:
+            logger.debug("Button RELEASED detected from Arduino (plain text): %s", line)
+            event = ButtonEvent(button_state="released")
+            if self.callback:
+                self._emit(event)
+        else:
+            logger.debug("Non-button line: %s", line)
+    
     def _auto_detect_port(self) -> Optional[str]:
         """
         Auto-detect Arduino port
@@ -199,25 +294,26 @@ class ButtonAdapter(InputPort):
             Port name if found, None otherwise
         """
         logger.info("Auto-detecting button Arduino port...")
-        ports = serial.tools.list_ports.comports()
-        
-        # First, check if COM7 is available (preferred button port)
-        for port in ports:
-            if port.device == "COM7":
-                if any(keyword in port.description.lower() for keyword in ['arduino', 'ch340', 'usb serial']):
-                    logger.info(f"Button Arduino found on preferred port COM7")
-                    return port.device
-        
-        # If COM7 not found, look for other Arduino devices (skip servo ports)
-        for port in ports:
+        # Single pass: COM7 is preferred, otherwise the first Arduino-like
+        # device that isn't one of the servo controller ports (COM3/COM4)
+        fallback = None
+        for port in _list_ports():
             logger.debug(f"Found port: {port.device} - {port.description}")
             
-            # Look for Arduino-like devices
-            if any(keyword in port.description.lower() for keyword in ['arduino', 'ch340', 'usb serial']):
-                # Skip COM3 and COM4 (servo controller ports)
-                if port.device not in ["COM3", "COM4"]:
-                    logger.info(f"Potential button Arduino found: {port.device}")
-                    return port.device
+            description = port.description.lower()
+            if not any(keyword in description for keyword in _ARDUINO_KEYWORDS):
+                continue
+            
+            if port.device == "COM7":
+                logger.info(f"Button Arduino found on preferred port COM7")
+                return port.device
+            
+            if fallback is None and port.device not in ("COM3", "COM4"):
+                fallback = port.device
+        
+        if fallback:
+            logger.info(f"Potential button Arduino found: {fallback}")
+            return fallback
         
         logger.warning("No button Arduino port auto-detected")
         return None
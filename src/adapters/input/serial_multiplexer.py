@@ -0,0 +1,171 @@
+"""
+Serial Multiplexer
+Reads one serial port once and fans parsed messages out to several adapters
+
+Stage 1 sends button and sensor messages over the same USB serial link.
+Instead of every adapter opening (and fighting over) the port, the
+multiplexer owns it and dispatches each JSON line to the subscribers of the
+top-level keys it contains ("button", "distance", "status", ...).
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import serial
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, close_transport, open_line_connection
+from src.adapters.serial_reader import ReaderThread, start_line_reader
+from src.adapters.serial_open import open_without_reset, set_low_latency
+
+logger = logging.getLogger(__name__)
+
+
+class SerialMultiplexer:
+    """
+    Single reader for a serial port shared by several input adapters
+
+    Subscribers register per JSON key and receive the whole parsed message.
+    Lines that are not JSON objects go to subscribers of the key None, as
+    raw bytes.
+    """
+
+    def __init__(self, port: str, baud_rate: int = 9600, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Initialize the multiplexer
+
+        Args:
+            port: Serial port (e.g., "COM7")
+            baud_rate: Baud rate (default 9600)
+            loop: Event loop to read the port on (needs pyserial-asyncio);
+                  without one a dedicated reader thread is used
+        """
+        self.port = port
+        self.baud_rate = baud_rate
+        self.loop = loop
+        self.serial_connection: Optional[serial.Serial] = None
+        self._subscribers: Dict[Optional[str], List[Callable]] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._reader: Optional[ReaderThread] = None
+        self._transport: Optional[asyncio.Transport] = None
+
+    def subscribe(self, key: Optional[str], callback: Callable):
+        """
+        Register a callback for messages containing key
+
+        Args:
+            key: Top-level JSON key, or None for non-JSON lines
+            callback: Called with the parsed dict (or raw bytes for None)
+        """
+        with self._lock:
+            # Copy-on-write so the reader never iterates a list being changed
+            self._subscribers[key] = self._subscribers.get(key, []) + [callback]
+
+    def unsubscribe(self, key: Optional[str], callback: Callable):
+        """Remove a callback registered with subscribe()"""
+        with self._lock:
+            callbacks = [cb for cb in self._subscribers.get(key, []) if cb != callback]
+            if callbacks:
+                self._subscribers[key] = callbacks
+            else:
+                self._subscribers.pop(key, None)
+
+    def start(self):
+        """Open the port and start reading (no-op if already running)"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+
+        try:
+            logger.info(f"Serial multiplexer opening {self.port} @ {self.baud_rate} baud")
+            self.serial_connection = open_without_reset(
+                self.port,
+                self.baud_rate,
+                timeout=1,
+                # Return a burst as soon as the line goes quiet for 20ms
+                inter_byte_timeout=0.02
+            )
+
+            # Skip the USB-serial latency timer (Linux) and return buffered
+            # bytes without waiting out the read timeout (Windows)
+            set_low_latency(self.serial_connection)
+
+            # The board was not reset by the open; just drop stale bytes
+            self.serial_connection.reset_input_buffer()
+
+            if self.loop is not None and SERIAL_ASYNCIO_AVAILABLE:
+                self._transport, _ = open_line_connection(
+                    self.loop, self.serial_connection,
+                    self._dispatch_line, self._on_connection_lost
+                )
+            else:
+                self._reader = start_line_reader(
+                    self.serial_connection, self._dispatch_line, self._on_connection_lost
+                )
+
+            logger.info(f"Serial multiplexer started on {self.port}")
+
+        except Exception:
+            self._running = False
+            raise
+
+    def stop(self):
+        """Stop reading and close the port"""
+        self._running = False
+
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            close_transport(self.loop, transport)
+        else:
+            reader, self._reader = self._reader, None
+            if reader is not None:
+                # Stops the thread (cancel_read + join) and closes the port
+                reader.close()
+            elif self.serial_connection and self.serial_connection.is_open:
+                self.serial_connection.close()
+
+        logger.info(f"Serial multiplexer on {self.port} stopped")
+
+    def is_running(self) -> bool:
+        """Check if the port is being read"""
+        return self._running
+
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        if exc is not None:
+            logger.error(f"Serial error on {self.port}: {exc}")
+        self._running = False
+
+    def _dispatch_line(self, line: bytes):
+        """Parse one line and hand it to the subscribers of its keys"""
+        subscribers = self._subscribers
+
+        data = None
+        if line[:1] == b'{':
+            try:
+                data = _loads(line)
+            except ValueError:
+                pass
+
+        if not isinstance(data, dict):
+            for callback in subscribers.get(None, ()):
+                self._call(callback, line)
+            return
+
+        for key in data:
+            for callback in subscribers.get(key, ()):
+                self._call(callback, data)
+
+    def _call(self, callback: Callable, payload):
+        try:
+            callback(payload)
+        except Exception as e:
+            logger.error(f"Error in multiplexer subscriber {callback}: {e}")
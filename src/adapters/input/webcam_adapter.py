@@ -2,19 +2,20 @@
 Webcam Adapter - Hand detection input
 Detects hand gestures using MediaPipe
 """
+import functools
+import importlib.util
 import logging
 import threading
 import time
 from typing import Optional, Callable
 from dataclasses import dataclass
 
-try:
-    import cv2
-    import mediapipe as mp
-    WEBCAM_AVAILABLE = True
-except ImportError:
-    WEBCAM_AVAILABLE = False
-    print("Webcam support not available. Install: pip install opencv-python mediapipe")
+# OpenCV and MediaPipe pull in large native libraries (TFLite, XNNPACK),
+# so they are only imported when the webcam is actually started
+cv2 = None
+mp = None
+mp_tasks = None  # MediaPipe Tasks API (HandLandmarker, can run on the GPU delegate)
+mp_vision = None
 
 from src.core.ports.input_port import SensorInputPort
 from src.core.domain.events import ProximityEvent
@@ -22,6 +23,29 @@ from src.core.domain.events import ProximityEvent
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _probe_webcam() -> bool:
+    """Check that OpenCV and MediaPipe are installed, without importing them"""
+    available = all(importlib.util.find_spec(name) is not None for name in ("cv2", "mediapipe"))
+    if not available:
+        print("Webcam support not available. Install: pip install opencv-python mediapipe")
+    return available
+
+
+def _import_webcam_modules():
+    """Import OpenCV and MediaPipe on first use"""
+    global cv2, mp
+    import cv2
+    import mediapipe as mp
+
+
+def _import_mp_tasks():
+    """Import the MediaPipe Tasks API on first use"""
+    global mp_tasks, mp_vision
+    from mediapipe.tasks import python as mp_tasks
+    from mediapipe.tasks.python import vision as mp_vision
+
+
 @dataclass
 class HandGesture:
     """Represents a detected hand gesture"""
@@ -37,27 +61,76 @@ class WebcamAdapter(SensorInputPort):
     Uses MediaPipe for real-time hand tracking
     """
     
-    def __init__(self, camera_index: int = 0):
+    def __init__(
+        self,
+        camera_index: int = 0,
+        frame_width: int = 640,
+        frame_height: int = 480,
+        model_path: Optional[str] = None
+    ):
         """
         Initialize webcam adapter
         
         Args:
             camera_index: Camera device index (0 for default)
+            frame_width: Requested capture width
+            frame_height: Requested capture height
+            model_path: Path to a hand_landmarker.task model. When given,
+                        the MediaPipe Tasks HandLandmarker is used on the GPU
+                        delegate; otherwise (or if that fails) the legacy
+                        CPU-only Hands solution
         """
-        if not WEBCAM_AVAILABLE:
+        if not _probe_webcam():
             raise ImportError("OpenCV and MediaPipe required. Install: pip install opencv-python mediapipe")
         
         self.camera_index = camera_index
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.model_path = model_path
         self.cap = None
-        self.mp_hands = mp.solutions.hands
+        self.mp_hands = None
         self.hands = None
+        self._use_tasks = False
+        self._last_timestamp_ms = 0
         self._running = False
         self._thread = None
+        self._grab_thread = None
         self._callback: Optional[Callable] = None
         
         # Hand detection state
         self.last_hand_raised = False
         self.hand_raise_threshold = 0.3  # Y position threshold (lower = higher in frame)
+        self._hand_present = False
+        
+        # Temporal gating: with no hand in view MediaPipe only runs on every
+        # detect_interval-th frame, and not at all once the scene has been
+        # static for static_frames frames
+        self.motion_threshold = 2.0  # Mean abs gray-level change of the 32x32 thumbnail
+        self.static_frames = 15
+        self.detect_interval = 3
+        self._prev_thumb = None
+        self._static_count = 0
+        self._frame_count = 0
+        
+        # Latest-frame slot shared by the grab and detection threads.
+        # Three buffers: one being filled, the newest complete frame, and
+        # the one MediaPipe is working on; they are swapped under the lock
+        # so frames are never copied or reallocated. The condition wakes
+        # the detection thread when a new frame arrives.
+        self._frame_lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._frame_lock)
+        self._frames = [None, None, None]
+        self._write_slot, self._ready_slot, self._read_slot = 0, 1, 2
+        self._frame_seq = 0
+        self._read_seq = 0
+        
+        # Preprocessing output buffers, allocated by OpenCV on the first frame
+        self.inference_width = 256  # Frames are downscaled to this width for MediaPipe
+        self.use_opencl = True  # Preprocess through OpenCL (cv2.UMat) when a device is available
+        self._use_opencl = False
+        self._small_buf = None
+        self._flip_buf = None
+        self._rgb_buf = None
         
         logger.info(f"Webcam adapter initialized (camera {camera_index})")
     
@@ -73,21 +146,62 @@ class WebcamAdapter(SensorInputPort):
             return
         
         try:
+            _import_webcam_modules()
+            self.mp_hands = mp.solutions.hands
+            
             # Initialize webcam
             self.cap = cv2.VideoCapture(self.camera_index)
             if not self.cap.isOpened():
                 raise RuntimeError(f"Could not open camera {self.camera_index}")
             
-            # Initialize MediaPipe Hands
-            self.hands = self.mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=1,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
+            # Keep only the newest frame in the driver queue so detection
+            # never works on stale frames
+            if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                logger.warning("Camera backend ignored CAP_PROP_BUFFERSIZE")
+            
+            # MJPG at 640x480 moves far fewer bytes over USB than raw YUYV
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
+            
+            self._use_opencl = self.use_opencl and cv2.ocl.haveOpenCL()
+            if self._use_opencl:
+                cv2.ocl.setUseOpenCL(True)
+                logger.info("Webcam preprocessing on OpenCL")
+            
+            # Initialize MediaPipe: GPU HandLandmarker if possible, legacy Hands otherwise
+            self.hands = None
+            self._use_tasks = False
+            if self.model_path:
+                try:
+                    _import_mp_tasks()
+                    self.hands = self._create_hand_landmarker()
+                    self._use_tasks = True
+                    logger.info("MediaPipe HandLandmarker running on GPU delegate")
+                except Exception as e:
+                    logger.warning(f"GPU HandLandmarker unavailable ({e}), using legacy MediaPipe Hands")
             
+            if self.hands is None:
+                self.hands = self.mp_hands.Hands(
+                    static_image_mode=False,
+                    max_num_hands=1,
+                    min_detection_confidence=0.5,
+                    min_tracking_confidence=0.5
+                )
+            
+            self._frames = [None, None, None]
+            self._frame_seq = 0
+            self._read_seq = 0
+            self._prev_thumb = None
+            self._static_count = 0
+            self._hand_present = False
             self._running = True
             
+            # Grab thread keeps draining the camera; detection only ever
+            # sees the newest frame
+            self._grab_thread = threading.Thread(target=self._grab_loop, name="webcam-grab", daemon=True)
+            self._grab_thread.start()
+            
             # Start detection thread
             self._thread = threading.Thread(target=self._detection_loop, daemon=True)
             self._thread.start()
@@ -103,10 +217,15 @@ class WebcamAdapter(SensorInputPort):
         """Stop webcam capture"""
         logger.info("Stopping webcam adapter...")
         self._running = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()
         
         if self._thread:
             self._thread.join(timeout=2.0)
         
+        if self._grab_thread:
+            self._grab_thread.join(timeout=2.0)
+        
         if self.hands:
             self.hands.close()
         
@@ -115,39 +234,71 @@ class WebcamAdapter(SensorInputPort):
         
         logger.info("Webcam adapter stopped")
     
+    def _grab_loop(self):
+        """Capture loop (runs in background thread), publishes the newest frame"""
+        cap = self.cap
+        
+        while self._running:
+            try:
+                if not cap.grab():
+                    logger.warning("Failed to read frame from webcam")
+                    time.sleep(0.1)
+                    continue
+                
+                # Decode into the spare buffer (reused once it has the right shape)
+                ret, frame = cap.retrieve(self._frames[self._write_slot])
+                if not ret:
+                    continue
+                
+                with self._frame_lock:
+                    self._frames[self._write_slot] = frame
+                    self._write_slot, self._ready_slot = self._ready_slot, self._write_slot
+                    self._frame_seq += 1
+                    self._frame_ready.notify()
+                
+            except Exception as e:
+                logger.error(f"Error in grab loop: {e}")
+                time.sleep(0.1)
+    
+    def _take_latest_frame(self, timeout: float = 0.5):
+        """Wait for a frame not yet processed and return it (None on timeout or stop)"""
+        with self._frame_ready:
+            if not self._frame_ready.wait_for(
+                lambda: self._frame_seq != self._read_seq or not self._running,
+                timeout
+            ) or not self._running:
+                return None
+            self._read_seq = self._frame_seq
+            self._ready_slot, self._read_slot = self._read_slot, self._ready_slot
+            return self._frames[self._read_slot]
+    
     def _detection_loop(self):
         """Main detection loop (runs in background thread)"""
         logger.info("Hand detection loop started")
         
         while self._running:
             try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    logger.warning("Failed to read frame from webcam")
-                    time.sleep(0.1)
+                # Paced by frame arrival: blocks until the grab thread
+                # publishes a newer frame
+                frame = self._take_latest_frame()
+                if frame is None:
                     continue
                 
-                # Flip frame horizontally for mirror view
-                frame = cv2.flip(frame, 1)
+                if self._skip_inference(frame):
+                    continue
                 
-                # Convert BGR to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                rgb_frame = self._preprocess(frame)
                 
                 # Process frame with MediaPipe
-                results = self.hands.process(rgb_frame)
-                
-                # Detect hand gestures
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        self._process_hand(hand_landmarks)
+                if self._use_tasks:
+                    # Results arrive on _on_landmarker_result
+                    self._detect_async(rgb_frame)
                 else:
-                    # No hand detected
-                    if self.last_hand_raised:
-                        self.last_hand_raised = False
-                        logger.debug("Hand lowered")
-                
-                # Small delay to control frame rate
-                time.sleep(0.033)  # ~30 FPS
+                    results = self.hands.process(rgb_frame)
+                    self._handle_hands(
+                        [hand.landmark for hand in results.multi_hand_landmarks]
+                        if results.multi_hand_landmarks else None
+                    )
                 
             except Exception as e:
                 logger.error(f"Error in detection loop: {e}")
@@ -155,45 +306,142 @@ class WebcamAdapter(SensorInputPort):
         
         logger.info("Hand detection loop ended")
     
-    def _process_hand(self, hand_landmarks):
+    def _preprocess(self, frame):
+        """Downscale, mirror and convert a BGR frame to RGB for MediaPipe"""
+        # Downscale before anything else: the palm detector works
+        # at 192x192 anyway, so full-resolution frames only cost
+        # bandwidth (landmarks are normalized, nothing to rescale)
+        height, width = frame.shape[:2]
+        size = None
+        if width > self.inference_width:
+            size = (self.inference_width, round(height * self.inference_width / width))
+        
+        if self._use_opencl:
+            # T-API: the three passes run on the GPU, only the small RGB
+            # result is downloaded
+            umat = cv2.UMat(frame)
+            if size:
+                umat = cv2.resize(umat, size, interpolation=cv2.INTER_AREA)
+            umat = cv2.flip(umat, 1)
+            return cv2.cvtColor(umat, cv2.COLOR_BGR2RGB).get()
+        
+        # (dst= reuses the buffers from the previous frame)
+        if size:
+            self._small_buf = cv2.resize(frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            frame = self._small_buf
+        
+        # Flip frame horizontally for mirror view
+        self._flip_buf = cv2.flip(frame, 1, dst=self._flip_buf)
+        
+        # Convert BGR to RGB
+        self._rgb_buf = cv2.cvtColor(self._flip_buf, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        return self._rgb_buf
+    
+    def _create_hand_landmarker(self):
+        """Create a live-stream HandLandmarker on the GPU delegate"""
+        options = mp_vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(
+                model_asset_path=self.model_path,
+                delegate=mp_tasks.BaseOptions.Delegate.GPU
+            ),
+            running_mode=mp_vision.RunningMode.LIVE_STREAM,
+            num_hands=1,
+            min_hand_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            result_callback=self._on_landmarker_result
+        )
+        return mp_vision.HandLandmarker.create_from_options(options)
+    
+    def _detect_async(self, rgb_frame):
+        """Queue a frame on the HandLandmarker (timestamps must increase)"""
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        self.hands.detect_async(image, timestamp_ms)
+    
+    def _on_landmarker_result(self, result, output_image, timestamp_ms: int):
+        """HandLandmarker live-stream callback (runs on a MediaPipe thread)"""
+        try:
+            self._handle_hands(result.hand_landmarks or None)
+        except Exception as e:
+            logger.error(f"Error handling hand landmarker result: {e}")
+    
+    def _handle_hands(self, hands):
         """
-        Process detected hand landmarks
+        Update gesture state from one inference result
         
         Args:
-            hand_landmarks: MediaPipe hand landmarks
+            hands: List of landmark sequences (one per hand), or None
         """
-        # Get wrist position (landmark 0)
-        wrist = hand_landmarks.landmark[0]
+        self._hand_present = bool(hands)
+        if hands:
+            for landmarks in hands:
+                self._process_hand(landmarks)
+        else:
+            # No hand detected
+            if self.last_hand_raised:
+                self.last_hand_raised = False
+                logger.debug("Hand lowered")
+    
+    def _skip_inference(self, frame) -> bool:
+        """
+        Decide whether MediaPipe can be skipped for this frame
         
-        # Get middle finger tip (landmark 12)
-        middle_finger_tip = hand_landmarks.landmark[12]
+        While a hand is tracked every frame is processed. Otherwise only
+        every detect_interval-th frame is, and none while the scene stays
+        static.
+        """
+        thumb = cv2.cvtColor(
+            cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
+        prev, self._prev_thumb = self._prev_thumb, thumb
         
-        # Check if hand is raised (middle finger tip is above wrist)
-        hand_raised = middle_finger_tip.y < self.hand_raise_threshold
+        if prev is not None and cv2.mean(cv2.absdiff(thumb, prev))[0] < self.motion_threshold:
+            self._static_count += 1
+        else:
+            self._static_count = 0
+        
+        if self._hand_present:
+            return False
+        
+        if self._static_count >= self.static_frames:
+            return True
+        
+        self._frame_count += 1
+        return self._frame_count % self.detect_interval != 0
+    
+    def _process_hand(self, landmarks):
+        """
+        Process detected hand landmarks
+        
+        Args:
+            landmarks: The 21 normalized landmarks of one hand (legacy
+                       landmark list or HandLandmarker result entry)
+        """
+        # Only the middle finger tip (landmark 12) matters; read its y once
+        tip_y = landmarks[12].y
+        
+        # Check if hand is raised (middle finger tip is above the threshold)
+        hand_raised = tip_y < self.hand_raise_threshold
         
         # Detect hand raise event (transition from down to up)
         if hand_raised and not self.last_hand_raised:
             logger.info("✋ Hand raised detected!")
             
-            # Create gesture event
-            gesture = HandGesture(
-                hand_raised=True,
-                hand_position=(middle_finger_tip.x, middle_finger_tip.y),
-                confidence=1.0,
-                timestamp=time.time()
-            )
-            
             # Trigger callback
             if self._callback:
+                hand_position = (landmarks[12].x, tip_y)
+                
                 # Convert to ProximityEvent for compatibility
                 # Use Y position as "distance" (inverted)
-                distance = (1.0 - middle_finger_tip.y) * 50  # 0-50cm range
+                distance = (1.0 - tip_y) * 50  # 0-50cm range
                 
                 event = ProximityEvent(
                     distance=distance,
                     sensor_id="webcam_hand",
                     metadata={
-                        'hand_position': (middle_finger_tip.x, middle_finger_tip.y),
+                        'hand_position': hand_position,
                         'gesture': 'hand_raised'
                     }
                 )
@@ -213,4 +461,4 @@ class WebcamAdapter(SensorInputPort):
     
     def is_available(self) -> bool:
         """Check if webcam is available"""
-        return WEBCAM_AVAILABLE and self._running
+        return _probe_webcam() and self._running
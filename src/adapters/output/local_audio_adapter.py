@@ -2,18 +2,94 @@
 Local Audio Output Adapter
 Plays sound locally using PyAudio and NumPy
 """
+import collections
+import functools
+import math
 import numpy as np
-import pyaudio
-import threading
 import logging
 from typing import Optional
-import queue
 
-from core.ports.output_port import AudioOutputPort
-from core.domain.events import SoundEvent
+# Optional JIT for generating tones that are not cached yet
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from src.core.ports.output_port import AudioOutputPort
+from src.core.domain.events import SoundEvent
 
 logger = logging.getLogger(__name__)
 
+# PyAudio loads PortAudio and probes the sound devices, so it is only
+# imported by initialize()
+pyaudio = None
+
+
+@functools.lru_cache(maxsize=None)
+def _fade_envelope(sample_rate: int):
+    """Return the (fade_in, fade_out) 10ms float32 ramps for a sample rate"""
+    fade_in = np.linspace(0, 1, int(sample_rate * 0.01), dtype=np.float32)
+    fade_out = fade_in[::-1].copy()
+    fade_in.flags.writeable = False
+    fade_out.flags.writeable = False
+    return fade_in, fade_out
+
+
+def _fill_tone(out, frequency, sample_rate, fade):
+    """
+    Write a unit sine tone with linear fade in/out into out (float32)
+    
+    Same result as the NumPy path in _unit_tone, in a single pass with no
+    temporaries once compiled by Numba.
+    """
+    n = out.shape[0]
+    w = 2.0 * math.pi * frequency / sample_rate
+    faded = fade > 1 and n > fade * 2
+    for i in range(n):
+        gain = 1.0
+        if faded:
+            if i < fade:
+                gain = i / (fade - 1)
+            elif i >= n - fade:
+                gain = (n - 1 - i) / (fade - 1)
+        out[i] = gain * math.sin(w * i)
+
+
+if NUMBA_AVAILABLE:
+    _fill_tone = numba.njit(cache=True, fastmath=True)(_fill_tone)
+
+
+@functools.lru_cache(maxsize=128)
+def _unit_tone(frequency: float, duration: float, sample_rate: int) -> np.ndarray:
+    """
+    Build a unit-amplitude float32 sine tone with the click-free fades baked in
+    
+    Cached per (frequency, duration), so repeated notes cost only a gain
+    multiply. The returned array is read-only because it is shared.
+    """
+    num_samples = int(sample_rate * duration)
+    fade_in, fade_out = _fade_envelope(sample_rate)
+    fade_samples = len(fade_in)  # 10ms fade
+    
+    if NUMBA_AVAILABLE:
+        tone = np.empty(num_samples, dtype=np.float32)
+        _fill_tone(tone, float(frequency), float(sample_rate), fade_samples)
+        tone.flags.writeable = False
+        return tone
+    
+    # Generate sine wave in float32 (no float64 temporaries or cast)
+    t = np.arange(num_samples, dtype=np.float32) / np.float32(sample_rate)
+    tone = np.sin(np.float32(2 * np.pi * frequency) * t, dtype=np.float32)
+    
+    # Apply fade in/out envelope to prevent clicks
+    if num_samples > fade_samples * 2:
+        tone[:fade_samples] *= fade_in
+        tone[-fade_samples:] *= fade_out
+    
+    tone.flags.writeable = False
+    return tone
+
 
 class LocalAudioAdapter(AudioOutputPort):
     """
@@ -35,31 +111,40 @@ class LocalAudioAdapter(AudioOutputPort):
         self.stream: Optional[pyaudio.Stream] = None
         self._master_volume = 0.7
         self._initialized = False
-        self._sound_queue = queue.Queue()
-        self._playback_thread: Optional[threading.Thread] = None
         self._running = False
         
+        # Tones waiting to be played, as (unit tone, gain)
+        self._pending = collections.deque()
+        self._current = None
+        self._position = 0
+        self._out_buf = np.empty(0, dtype=np.int16)  # Reused callback buffer
+        self._silence = b''  # Shared all-zero buffer returned while idle
+        
     def initialize(self) -> bool:
         """Initialize PyAudio"""
+        global pyaudio
         try:
             logger.info("Initializing local audio output")
+            import pyaudio
             self.pyaudio_instance = pyaudio.PyAudio()
             
-            # Open audio stream
+            # Open audio stream in callback mode: PortAudio pulls samples
+            # from _pending, so play_sound never blocks on playback
             self.stream = self.pyaudio_instance.open(
-                format=pyaudio.paFloat32,
+                format=pyaudio.paInt16,
                 channels=self.channels,
                 rate=self.sample_rate,
                 output=True,
-                frames_per_buffer=1024
+                frames_per_buffer=256,
+                stream_callback=self._pa_callback
             )
             
             self._initialized = True
             self._running = True
             
-            # Start playback thread
-            self._playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
-            self._playback_thread.start()
+            if NUMBA_AVAILABLE:
+                # Compile the tone kernel now rather than on the first note
+                _unit_tone(440.0, 0.5, self.sample_rate)
             
             logger.info("Local audio output initialized successfully")
             return True
@@ -81,74 +166,71 @@ class LocalAudioAdapter(AudioOutputPort):
         try:
             logger.debug(f"Playing sound: {sound_event.frequency}Hz for {sound_event.duration}s")
             
-            # Add to queue for playback
-            self._sound_queue.put(sound_event)
+            # Cached unit tone (rounded so near-identical notes share an entry)
+            tone = _unit_tone(
+                round(sound_event.frequency, 2),
+                round(sound_event.duration, 3),
+                self.sample_rate
+            )
+            
+            # Add to queue for playback; the callback scales the tone to int16
+            gain = max(0.0, min(1.0, sound_event.amplitude * self._master_volume)) * 32767
+            self._pending.append((tone, gain))
             return True
             
         except Exception as e:
             logger.error(f"Error playing sound: {e}")
             return False
     
-    def _playback_loop(self):
-        """Background thread for playing sounds"""
-        logger.info("Audio playback loop started")
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio output callback: fill one buffer from the pending tones"""
+        num_samples = frame_count * self.channels
         
-        while self._running:
-            try:
-                # Get sound event from queue (with timeout)
-                sound_event = self._sound_queue.get(timeout=0.1)
-                self._generate_and_play(sound_event)
-                
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Error in playback loop: {e}")
-    
-    def _generate_and_play(self, sound_event: SoundEvent):
-        """Generate and play a tone"""
+        # Idle (the common case): hand back the same silent buffer without
+        # touching the array or copying it
+        if self._current is None and not self._pending:
+            if len(self._silence) != num_samples * 2:
+                self._silence = bytes(num_samples * 2)
+            return self._silence, pyaudio.paContinue
+        
+        if len(self._out_buf) < num_samples:
+            self._out_buf = np.empty(num_samples, dtype=np.int16)
+        out = self._out_buf[:num_samples]
+        
+        filled = 0
         try:
-            # Calculate number of samples
-            num_samples = int(self.sample_rate * sound_event.duration)
-            
-            # Generate time array
-            t = np.linspace(0, sound_event.duration, num_samples, False)
-            
-            # Generate sine wave
-            frequency = sound_event.frequency
-            amplitude = sound_event.amplitude * self._master_volume
-            
-            # Create tone with envelope to avoid clicks
-            tone = amplitude * np.sin(2 * np.pi * frequency * t)
-            
-            # Apply fade in/out envelope to prevent clicks
-            fade_samples = int(self.sample_rate * 0.01)  # 10ms fade
-            if num_samples > fade_samples * 2:
-                # Fade in
-                fade_in = np.linspace(0, 1, fade_samples)
-                tone[:fade_samples] *= fade_in
-                
-                # Fade out
-                fade_out = np.linspace(1, 0, fade_samples)
-                tone[-fade_samples:] *= fade_out
-            
-            # Convert to float32
-            audio_data = tone.astype(np.float32)
-            
-            # Play audio
-            if self.stream and self.stream.is_active():
-                self.stream.write(audio_data.tobytes())
+            # Tones play back to back, in the order they were queued
+            while filled < num_samples:
+                if self._current is None:
+                    if not self._pending:
+                        break
+                    self._current = self._pending.popleft()
+                    self._position = 0
                 
+                tone, gain = self._current
+                count = min(num_samples - filled, len(tone) - self._position)
+                # Scale and quantize to int16 PCM in one pass
+                np.multiply(
+                    tone[self._position:self._position + count], gain,
+                    out=out[filled:filled + count], casting='unsafe'
+                )
+                filled += count
+                self._position += count
+                if self._position >= len(tone):
+                    self._current = None
         except Exception as e:
-            logger.error(f"Error generating/playing tone: {e}")
+            # Raising here would abort the stream
+            logger.error(f"Error in audio callback: {e}")
+        
+        # Silence when nothing is queued
+        out[filled:] = 0
+        return out.tobytes(), pyaudio.paContinue
     
     def stop(self):
         """Stop audio output"""
         logger.info("Stopping local audio output")
         self._running = False
         
-        if self._playback_thread:
-            self._playback_thread.join(timeout=2)
-        
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
@@ -157,6 +239,8 @@ class LocalAudioAdapter(AudioOutputPort):
             self.pyaudio_instance.terminate()
         
         self._initialized = False
+        self._pending.clear()
+        self._current = None
         logger.info("Local audio output stopped")
     
     def is_available(self) -> bool:
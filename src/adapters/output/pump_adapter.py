@@ -3,16 +3,40 @@ Pump Output Adapter
 Controls suction pump via Arduino serial commands (COM4)
 Receives activation signals from Stage 1 Arduino via Python bridge
 """
+import asyncio
 import logging
+import os
 import serial
 import serial.tools.list_ports
-import time
+import sys
 import threading
 import json
-from typing import Optional, Callable
+import queue
+from typing import Callable, Dict, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, close_transport, open_line_connection
+from src.adapters.serial_open import set_low_latency
 
 logger = logging.getLogger(__name__)
 
+# Pump commands, pre-encoded (suction levels are 0-90)
+_DEACTIVATE = b"DEACTIVATE_PUMP\n"
+_RESET = b"RESET\n"
+_ACTIVATE_CMDS = tuple(b"ACTIVATE_PUMP:%d\n" % level for level in range(91))
+_SET_SUCTION_CMDS = tuple(b"SET_SUCTION:%d\n" % level for level in range(91))
+
+# Reader thread receive buffer; a status line is well under 100 bytes
+_RX_BUF_SIZE = 4096
+
+# Start of the status field as printed by the sketch (compact JSON)
+_STATUS_PREFIX = b'"status":"'
+
 
 class PumpAdapter:
     """
@@ -21,7 +45,13 @@ class PumpAdapter:
     Supports configurable suction strength (0=max, 90=off)
     """
     
-    def __init__(self, port: str = "COM4", baud_rate: int = 9600, suction_level: int = 60):
+    def __init__(
+        self,
+        port: str = "COM4",
+        baud_rate: int = 9600,
+        suction_level: int = 60,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
         """
         Initialize pump adapter
         
@@ -29,19 +59,37 @@ class PumpAdapter:
             port: Serial port for pump Arduino (default COM4)
             baud_rate: Baud rate (default 9600)
             suction_level: Suction strength 0-90 (0=max, 60=medium, 90=off)
+            loop: Event loop to read the port on (needs pyserial-asyncio);
+                  without one a dedicated reader thread is used
         """
         self.port = port
         self.baud_rate = baud_rate
         self.suction_level = suction_level
         self.serial_connection: Optional[serial.Serial] = None
         self._initialized = False
+        self.loop = loop
         self._read_thread: Optional[threading.Thread] = None
+        self._transport: Optional[asyncio.Transport] = None
+        self._callback_thread: Optional[threading.Thread] = None
+        self._callback_queue = queue.SimpleQueue()  # Callbacks to run, None stops the worker
+        self._fd: Optional[int] = None  # Raw tty fd for command writes (POSIX only)
+        self._rx_buf = bytearray(_RX_BUF_SIZE)  # Reader thread receive buffer
+        self._rx_view = memoryview(self._rx_buf)
         self._running = False
         
-        # Callback for pump deactivation complete
-        self._deactivation_callback: Optional[Callable] = None
+        # PUMP_VERBOSE=1 echoes every line from the pump Arduino to the console
+        self._verbose = os.environ.get('PUMP_VERBOSE', '0') not in ('', '0')
         
-        logger.info(f"Pump Adapter initialized on {port} @ {baud_rate} baud, suction level: {suction_level}")
+        # Callback for pump deactivation complete; never None, so the
+        # reader hands it over without checking
+        self._deactivation_callback: Callable[[], None] = self._no_deactivation_callback
+        
+        # Pump statuses that need action, by status value
+        self._status_handlers: Dict[str, Callable[[], None]] = {
+            'pump_inactive': self._on_pump_inactive,
+        }
+        
+        logger.info("Pump Adapter initialized on %s @ %s baud, suction level: %s", port, baud_rate, suction_level)
     
     def initialize(self) -> bool:
         """
@@ -58,69 +106,163 @@ class PumpAdapter:
                 timeout=1
             )
             
-            # Wait for Arduino to initialize
-            time.sleep(2)
+            # POSIX ttys are unbuffered, so commands can go straight to the fd
+            self._fd = self.serial_connection.fileno() if sys.platform != 'win32' else None
+            
+            # Wait for Arduino to initialize: opening the port resets it and
+            # it announces {"status":"pump_ready"} once setup() is done, so
+            # block on that line (up to the old fixed 2s) instead of sleeping
+            self.serial_connection.timeout = 2
+            msg = self.serial_connection.readline().strip()
+            self.serial_connection.timeout = 1
+            
+            # After the final timeout: pyserial rewrites the Windows
+            # COMMTIMEOUTS on every timeout change. Keeps status lines from
+            # waiting on the USB-serial latency timer
+            set_low_latency(self.serial_connection)
             
-            # Read initialization message
-            if self.serial_connection.in_waiting > 0:
-                msg = self.serial_connection.readline().decode('utf-8').strip()
-                logger.info(f"Pump controller: {msg}")
+            if msg:
+                logger.info("Pump controller: %s", msg.decode('utf-8', errors='replace'))
+            else:
+                logger.warning("No ready message from pump controller")
             
             self._initialized = True
             self._running = True
             
-            # Start read thread
-            self._read_thread = threading.Thread(target=self._read_serial, daemon=True)
-            self._read_thread.start()
+            if self.loop is not None and SERIAL_ASYNCIO_AVAILABLE:
+                # Read on the shared event loop, no thread of our own
+                self._transport, _ = open_line_connection(
+                    self.loop, self.serial_connection,
+                    self._handle_line, self._on_connection_lost
+                )
+            else:
+                # Start read thread
+                self._read_thread = threading.Thread(target=self._read_serial, daemon=True)
+                self._read_thread.start()
             
-            logger.info(f"Pump adapter initialized on {self.port}")
+            # Callbacks (printer job) run here so they never stall the reader
+            self._callback_thread = threading.Thread(target=self._callback_worker, daemon=True)
+            self._callback_thread.start()
+            
+            logger.info("Pump adapter initialized on %s", self.port)
             return True
             
         except serial.SerialException as e:
-            logger.error(f"Failed to open pump serial port {self.port}: {e}")
+            logger.error("Failed to open pump serial port %s: %s", self.port, e)
             return False
         except Exception as e:
-            logger.error(f"Error initializing pump adapter: {e}")
+            logger.error("Error initializing pump adapter: %s", e)
             return False
     
     def _read_serial(self):
         """Background thread to read serial responses from pump Arduino"""
-        while self._running and self.serial_connection and self.serial_connection.is_open:
+        ser = self.serial_connection
+        if not ser:
+            return
+        
+        # Bound once: the loop body runs for every chunk received
+        readinto = ser.readinto
+        handle_line = self._handle_line
+        buf = self._rx_buf
+        view = self._rx_view
+        size = len(buf)
+        filled = 0  # Bytes in buf; anything there is an unfinished line
+        
+        while self._running and ser.is_open:
+            # Blocks for the first byte (or the 1s timeout, so stop() is
+            # noticed), then takes everything already buffered in one
+            # call; closing the port ends the wait
             try:
-                if self.serial_connection.in_waiting > 0:
-                    line = self.serial_connection.readline().decode('utf-8').strip()
-                    if line:
-                        logger.info(f"[PUMP] {line}")
-                        print(f"🔧 [PUMP] {line}")
-                        try:
-                            data = json.loads(line)
-                            status = data.get('status', '')
-                            if status:
-                                print(f"   Pump status: {status}")
-                                
-                                # Trigger callback when pump deactivation is complete
-                                if status == 'pump_inactive':
-                                    logger.info(f"Pump inactive detected. Callback registered: {self._deactivation_callback is not None}")
-                                    print(f"\n🔔 Pump deactivation complete! Callback: {self._deactivation_callback is not None}")
-                                    if self._deactivation_callback:
-                                        logger.info("Triggering printer callback...")
-                                        print("📞 Calling printer callback...")
-                                        try:
-                                            self._deactivation_callback()
-                                            print("✅ Callback executed successfully")
-                                        except Exception as e:
-                                            logger.error(f"Error in deactivation callback: {e}")
-                                            print(f"❌ Callback error: {e}")
-                                    else:
-                                        logger.warning("No deactivation callback registered!")
-                                        print("⚠️  No callback registered - printer won't trigger")
-                        except json.JSONDecodeError:
-                            pass
-                time.sleep(0.01)
-            except Exception as e:
+                want = min(ser.in_waiting or 1, size - filled)
+                n = readinto(view[filled:filled + want])
+            except (serial.SerialException, OSError, TypeError) as e:
+                # TypeError: pyserial's fd went away under a concurrent close()
                 if self._running:
-                    logger.error(f"Error reading pump serial: {e}")
+                    logger.error("Error reading pump serial: %s", e)
                 break
+            if not n:
+                continue
+            
+            # Only the new bytes can hold a newline; bytes objects are only
+            # created for complete lines handed upward
+            scan = filled
+            filled += n
+            start = 0
+            while (nl := buf.find(b'\n', scan, filled)) >= 0:
+                line = bytes(view[start:nl]).strip()
+                if line:
+                    handle_line(line)
+                start = scan = nl + 1
+            
+            if start:
+                # Move the partial line to the front; memoryview slice
+                # assignment uses memmove (the ranges overlap) and never
+                # resizes the exported buffer
+                view[:filled - start] = view[start:filled]
+                filled -= start
+            elif filled == size:
+                logger.warning("Pump sent %s bytes without a newline, discarding", size)
+                filled = 0
+    
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        if exc is not None and self._running:
+            logger.error("Error reading pump serial: %s", exc)
+        self._running = False
+    
+    def _handle_line(self, line: bytes):
+        """Handle one stripped line from the pump Arduino (raw bytes)"""
+        if self._verbose:
+            print(f"🔧 [PUMP] {line.decode('utf-8', errors='replace')}")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[PUMP] %s", line.decode('utf-8', errors='replace'))
+        
+        # Only JSON status messages matter; a byte test skips log chatter
+        # and other messages without decoding or parsing them
+        if line[:1] != b'{' or b'"status"' not in line:
+            return
+        
+        # The sketch prints compact JSON, so the status value can be sliced
+        # out of the raw bytes; anything else falls back to a full parse
+        start = line.find(_STATUS_PREFIX)
+        if start >= 0:
+            start += len(_STATUS_PREFIX)
+            status = line[start:line.find(b'"', start)].decode('utf-8', errors='replace')
+        else:
+            try:
+                data = _loads(line)
+            except ValueError:
+                return
+            status = data.get('status', '') if isinstance(data, dict) else ''
+        
+        if status:
+            if self._verbose:
+                print(f"   Pump status: {status}")
+            logger.debug("Pump status: %s", status)
+            
+            handler = self._status_handlers.get(status)
+            if handler:
+                handler()
+    
+    def _on_pump_inactive(self):
+        """Pump finished releasing: hand the registered callback to the worker"""
+        self._callback_queue.put(self._deactivation_callback)
+    
+    @staticmethod
+    def _no_deactivation_callback():
+        """Placeholder until register_deactivation_callback() is called"""
+        logger.warning("Pump inactive but no deactivation callback registered - printer won't trigger")
+    
+    def _callback_worker(self):
+        """Background thread running deactivation callbacks off the reader thread"""
+        while True:
+            callback = self._callback_queue.get()
+            if callback is None:
+                break
+            logger.info("Pump inactive, running deactivation callback")
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error in deactivation callback: %s", e)
     
     def stop(self):
         """Stop pump controller"""
@@ -132,11 +274,63 @@ class PumpAdapter:
             self.deactivate_pump()
         
         if self.serial_connection and self.serial_connection.is_open:
-            self.serial_connection.close()
+            self._fd = None
+            transport, self._transport = self._transport, None
+            if transport is not None:
+                # The transport owns the port and closes it; the final
+                # DEACTIVATE_PUMP is queued ahead of the close, which drains
+                # the write buffer first
+                close_transport(self.loop, transport)
+            else:
+                # Commands are not drained when sent; make sure the final
+                # DEACTIVATE_PUMP goes out before the port is closed
+                try:
+                    self.serial_connection.flush()
+                except serial.SerialException:
+                    pass
+                self.serial_connection.close()
+        
+        if self._callback_thread:
+            self._callback_queue.put(None)
+            self._callback_thread.join(timeout=2.0)
+            self._callback_thread = None
         
         self._initialized = False
         logger.info("Pump adapter stopped")
     
+    def _write_cmd(self, *cmds: bytes):
+        """
+        Send one or more newline-terminated commands in a single write
+        
+        Not drained: the bytes are queued and the call returns.
+        
+        Asyncio reader: the transport put the port in non-blocking mode
+        (write_timeout=0) when it took it over, so the command is handed to
+        transport.write on the loop, which buffers partial writes; a dead
+        transport raises SerialException here.
+        
+        Threaded reader: on POSIX the bytes are written to the fd directly
+        and pyserial only handles whatever the fd did not take.
+        """
+        data = cmds[0] if len(cmds) == 1 else b''.join(cmds)
+        transport = self._transport
+        if transport is not None:
+            if transport.is_closing():
+                raise serial.SerialException("Pump serial transport is closed")
+            self.loop.call_soon_threadsafe(transport.write, data)
+            return
+        
+        fd = self._fd
+        if fd is not None:
+            try:
+                written = os.write(fd, data)
+            except BlockingIOError:
+                written = 0
+            if written == len(data):
+                return
+            data = data[written:]
+        self.serial_connection.write(data)
+    
     def activate_pump(self, suction_level: Optional[int] = None) -> bool:
         """
         Activate suction pump with configurable strength
@@ -158,7 +352,7 @@ class PumpAdapter:
         
         # Validate level
         if level < 0 or level > 90:
-            logger.error(f"Invalid suction level: {level}. Must be 0-90")
+            logger.error("Invalid suction level: %s. Must be 0-90", level)
             print(f"❌ Invalid suction level: {level}")
             return False
         
@@ -169,14 +363,12 @@ class PumpAdapter:
             print("="*60)
             
             # Send command with suction level
-            command = f"ACTIVATE_PUMP:{level}\n"
-            self.serial_connection.write(command.encode())
-            self.serial_connection.flush()
-            logger.info(f"Pump activation command sent with suction level {level}")
+            self._write_cmd(_ACTIVATE_CMDS[level])
+            logger.info("Pump activation command sent with suction level %s", level)
             print(f"📤 Sent: ACTIVATE_PUMP:{level} to COM4")
             return True
         except Exception as e:
-            logger.error(f"Error activating pump: {e}")
+            logger.error("Error activating pump: %s", e)
             print(f"❌ Error: {e}")
             return False
     
@@ -196,13 +388,12 @@ class PumpAdapter:
             print("🔓 DEACTIVATING PUMP (RELEASING)")
             print("="*60)
             
-            self.serial_connection.write(b"DEACTIVATE_PUMP\n")
-            self.serial_connection.flush()
+            self._write_cmd(_DEACTIVATE)
             logger.info("Pump deactivation command sent")
             print("📤 Sent: DEACTIVATE_PUMP to COM4")
             return True
         except Exception as e:
-            logger.error(f"Error deactivating pump: {e}")
+            logger.error("Error deactivating pump: %s", e)
             print(f"❌ Error: {e}")
             return False
     
@@ -217,7 +408,7 @@ class PumpAdapter:
             True if command sent successfully
         """
         if level < 0 or level > 90:
-            logger.error(f"Invalid suction level: {level}. Must be 0-90")
+            logger.error("Invalid suction level: %s. Must be 0-90", level)
             return False
         
         if not self._initialized:
@@ -225,20 +416,18 @@ class PumpAdapter:
             return False
         
         try:
-            command = f"SET_SUCTION:{level}\n"
-            self.serial_connection.write(command.encode())
-            self.serial_connection.flush()
+            self._write_cmd(_SET_SUCTION_CMDS[level])
             self.suction_level = level
-            logger.info(f"Suction level set to {level}")
+            logger.info("Suction level set to %s", level)
             print(f"🔧 Suction level set to {level}")
             return True
         except Exception as e:
-            logger.error(f"Error setting suction level: {e}")
+            logger.error("Error setting suction level: %s", e)
             return False
     
     def register_deactivation_callback(self, callback: Callable):
         """Register callback to be called when pump deactivation is complete"""
-        self._deactivation_callback = callback
+        self._deactivation_callback = callback or self._no_deactivation_callback
         logger.info("Pump deactivation callback registered")
     
     def reset(self) -> bool:
@@ -247,12 +436,11 @@ class PumpAdapter:
             return False
         
         try:
-            self.serial_connection.write(b"RESET\n")
-            self.serial_connection.flush()
+            self._write_cmd(_RESET)
             logger.info("Pump reset command sent")
             return True
         except Exception as e:
-            logger.error(f"Error resetting pump: {e}")
+            logger.error("Error resetting pump: %s", e)
             return False
     
     def get_output_info(self) -> dict:
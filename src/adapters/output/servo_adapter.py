@@ -3,17 +3,53 @@ Servo Output Adapter
 Controls servo motors via Arduino serial commands (Stage 1 on COM7)
 Bridges pump commands to Stage 2 Arduino (COM4)
 """
+import asyncio
+import atexit
 import logging
+import queue
+import re
 import serial
 import serial.tools.list_ports
 import time
 import threading
 import json
 from datetime import datetime
-from typing import Optional, Callable
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, close_transport, open_line_connection
+from src.adapters.serial_open import set_low_latency
 
 logger = logging.getLogger(__name__)
 
+# Port descriptions that look like an Arduino (auto-detect)
+_ARDUINO_RE = re.compile(r'arduino|ch340|usb serial', re.I)
+
+# Records from this module go through a queue and are written by a listener
+# thread (to whatever handlers the root logger has by then), so the serial
+# reader never waits on the console or the log file
+_log_queue = queue.SimpleQueue()
+
+
+class _RootForwarder(logging.Handler):
+    """Hands queued records to the root logger's handlers"""
+    
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+
+_log_listener = QueueListener(_log_queue, _RootForwarder())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
 
 class ServoAdapter:
     """
@@ -21,7 +57,24 @@ class ServoAdapter:
     Sends commands to control servo motors and bridges pump signals
     """
     
-    def __init__(self, port: str = "COM7", baud_rate: int = 9600, auto_detect: bool = False):
+    # Stage 1 commands, pre-encoded
+    _CMD = {
+        'LEFT': b"LEFT_MOTOR\n",
+        'RIGHT': b"RIGHT_MOTOR\n",
+        'STOP': b"STOP\n",
+        'RESET': b"RESET\n",
+        'WIN': b"WIN\n",
+        'LOSE': b"LOSE\n",
+        'GATE': b"GATE_SEQUENCE\n",
+    }
+    
+    def __init__(
+        self,
+        port: str = "COM7",
+        baud_rate: int = 9600,
+        auto_detect: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
         """
         Initialize servo adapter
         
@@ -29,14 +82,22 @@ class ServoAdapter:
             port: Serial port for Stage 1 Arduino (default COM7)
             baud_rate: Baud rate (default 9600)
             auto_detect: Auto-detect Arduino port
+            loop: Event loop to read the port on (needs pyserial-asyncio);
+                  without one a dedicated reader thread is used
         """
         self.port = port
         self.baud_rate = baud_rate
         self.auto_detect = auto_detect
         self.serial_connection: Optional[serial.Serial] = None
         self._initialized = False
+        self.loop = loop
         self._read_thread: Optional[threading.Thread] = None
+        self._transport: Optional[asyncio.Transport] = None
         self._running = False
+        self._rx_buf = bytearray()  # Received bytes not yet split into lines
+        self._rx_queue = queue.SimpleQueue()  # Lines for the processing thread, None stops it
+        self._process_thread: Optional[threading.Thread] = None
+        self._tx_lock = threading.Lock()  # Commands come from the game and the reader side
         
         # Pump adapter reference (set externally)
         self.pump_adapter = None
@@ -53,6 +114,15 @@ class ServoAdapter:
         self._invite_callback: Optional[Callable] = None
         self._relay_callback: Optional[Callable] = None
         
+        # Stage 1 message handlers, by top-level JSON key
+        self._message_handlers: Dict[str, Callable] = {
+            'action': self._handle_action,
+            'button': self._handle_button,
+            'status': self._handle_status,
+            'invite': self._handle_invite,
+            'relay': self._handle_relay,
+        }
+        
         logger.info(f"Servo Adapter initialized on {port} @ {baud_rate} baud")
 
     def set_last_game_receipt(self, score: int, ascii_line: str, poem: str):
@@ -72,18 +142,34 @@ class ServoAdapter:
             logger.warning("No printer adapter available")
             return False
 
+        # Claimed before the job runs so the other trigger does not queue a
+        # second receipt; _on_receipt_done releases it if the print fails
+        self._receipt_printed = True
         if self._last_game_receipt:
             ok = self.printer_adapter.print_thank_you(
                 score=self._last_game_receipt.get('score'),
                 ascii_line=self._last_game_receipt.get('ascii_line'),
-                poem=self._last_game_receipt.get('poem')
+                poem=self._last_game_receipt.get('poem'),
+                on_done=self._on_receipt_done
             )
         else:
-            ok = self.printer_adapter.print_thank_you()
+            ok = self.printer_adapter.print_thank_you(on_done=self._on_receipt_done)
 
-        if ok:
-            self._receipt_printed = True
+        if not ok:
+            self._receipt_printed = False
         return ok
+
+    def _on_poem_printed(self, ok: bool):
+        if not ok:
+            logger.error("Error printing resilience poem")
+
+    def _on_receipt_done(self, ok: bool):
+        """Printer finished the receipt; on failure let the next trigger retry"""
+        if ok:
+            logger.info("Print job completed")
+        else:
+            logger.error("Print job failed - will retry on the next trigger")
+            self._receipt_printed = False
     
     def initialize(self) -> bool:
         """
@@ -104,7 +190,10 @@ class ServoAdapter:
             self.serial_connection = serial.Serial(
                 port=self.port,
                 baudrate=self.baud_rate,
-                timeout=1
+                timeout=1,
+                # A stuck bus raises SerialTimeoutException instead of
+                # hanging the caller (threaded reader only, see _write_cmd)
+                write_timeout=1.0
             )
             
             # Wait for Arduino to initialize
@@ -115,12 +204,31 @@ class ServoAdapter:
                 msg = self.serial_connection.readline().decode('utf-8').strip()
                 logger.info(f"Servo controller: {msg}")
             
+            # Short timeout so the reader notices stop() quickly even where
+            # cancel_read() is unavailable
+            self.serial_connection.timeout = 0.2
+            
+            # Stage 1 messages surface without the USB-serial latency timer
+            set_low_latency(self.serial_connection)
+            
             self._initialized = True
             self._running = True
             
-            # Start background thread to read serial messages
-            self._read_thread = threading.Thread(target=self._read_serial, daemon=True)
-            self._read_thread.start()
+            # Messages (JSON parse, callbacks, printing) are handled on their
+            # own thread so a slow callback never holds up the serial read
+            self._process_thread = threading.Thread(target=self._process_loop, daemon=True)
+            self._process_thread.start()
+            
+            if self.loop is not None and SERIAL_ASYNCIO_AVAILABLE:
+                # Read on the shared event loop, which only queues the lines
+                self._transport, _ = open_line_connection(
+                    self.loop, self.serial_connection,
+                    self._rx_queue.put, self._on_connection_lost
+                )
+            else:
+                # Start background thread to read serial messages
+                self._read_thread = threading.Thread(target=self._read_serial, daemon=True)
+                self._read_thread.start()
             
             logger.info(f"Servo adapter initialized on {self.port}")
             return True
@@ -155,26 +263,16 @@ class ServoAdapter:
         if self._receipt_printed:
             logger.info("Pump deactivation callback received but receipt already printed - skipping")
             return
-
-        logger.info("\n" + "="*60)
+        
         logger.info("CALLBACK TRIGGERED: Pump deactivation complete - triggering printer")
-        logger.info("="*60)
-        print("\n" + "="*60)
-        print("🖨️  PUMP RELEASED - PRINTING THANK YOU MESSAGE")
-        print("="*60)
+        print("\n🖨️  PUMP RELEASED - PRINTING THANK YOU MESSAGE")
         
         if self.printer_adapter:
-            logger.info(f"Printer adapter found: {self.printer_adapter}")
-            print(f"🖨️  Printer adapter: {self.printer_adapter.get_printer_info()}")
-            print("📝 Starting print job...")
+            logger.info(f"Printer adapter: {self.printer_adapter.get_printer_info()}")
             result = self._print_receipt_once()
-            if result:
-                print("✅ Print job completed!")
-            else:
-                print("❌ Print job failed!")
+            logger.info("Print job queued" if result else "Print job not queued")
         else:
             logger.warning("No printer adapter available")
-            print("⚠️  No printer adapter available")
     
     def register_status_callback(self, callback: Callable):
         """Register callback for status updates from Arduino"""
@@ -194,118 +292,139 @@ class ServoAdapter:
     
     def _read_serial(self):
         """Background thread to read serial messages from Stage 1 Arduino"""
-        while self._running and self.serial_connection and self.serial_connection.is_open:
+        ser = self.serial_connection
+        if not ser:
+            return
+        
+        # Bound once; a closed port ends the loop through the exception
+        read = ser.read
+        put = self._rx_queue.put
+        buf = self._rx_buf
+        
+        while self._running:
+            # Blocks for the first byte (or the timeout tick), then takes
+            # everything already buffered in one call; readline() would
+            # read byte by byte
             try:
-                if self.serial_connection.in_waiting > 0:
-                    line = self.serial_connection.readline().decode('utf-8').strip()
-                    if line:
-                        self._process_serial_message(line)
-                time.sleep(0.01)
-            except Exception as e:
+                chunk = read(ser.in_waiting or 1)
+            except (serial.SerialException, OSError, TypeError) as e:
+                # TypeError: pyserial's fd went away under a concurrent close()
                 if self._running:
                     logger.error(f"Error reading servo serial: {e}")
                 break
+            if not chunk:
+                continue
+            
+            buf += chunk
+            while (i := buf.find(b'\n')) != -1:
+                line = bytes(buf[:i]).strip()
+                del buf[:i + 1]
+                if line:
+                    put(line)
     
-    def _process_serial_message(self, message: str):
-        """Process incoming serial message from Stage 1 Arduino"""
-        logger.info(f"[STAGE1] {message}")
-        print(f"🤖 [STAGE1] {message}")
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        if exc is not None and self._running:
+            logger.error(f"Error reading servo serial: {exc}")
+        self._running = False
+    
+    def _process_loop(self):
+        """Background thread handling the lines queued by _read_serial"""
+        while True:
+            line = self._rx_queue.get()
+            if line is None:
+                break
+            try:
+                self._process_serial_message(line)
+            except Exception as e:
+                logger.error(f"Error processing Stage 1 message: {e}")
+    
+    def _process_serial_message(self, message: bytes):
+        """Process incoming serial message from Stage 1 Arduino (raw bytes)"""
+        logger.info("[STAGE1] %s", message.decode('utf-8', errors='replace'))
         
+        # orjson parses the bytes directly, no decode needed
         try:
-            data = json.loads(message)
-            
-            # Handle pump activation requests
-            action = data.get('action', '')
-            if action == 'activate_pump':
-                print("\n" + "="*60)
-                print("💨 STAGE 1 REQUESTING PUMP ACTIVATION!")
-                print("="*60)
-                if self.pump_adapter:
-                    print(f"   Pump adapter found: {self.pump_adapter}")
-                    print(f"   Pump initialized: {self.pump_adapter._initialized}")
-                    result = self.pump_adapter.activate_pump()
-                    print(f"   Activation result: {'✅ Success' if result else '❌ Failed'}")
-                else:
-                    logger.warning("No pump adapter connected!")
-                    print("⚠️  No pump adapter connected to servo adapter!")
-                    print("   Check if pump was initialized and linked properly")
-            
-            elif action == 'deactivate_pump':
-                print("\n" + "="*60)
-                print("🔓 STAGE 1 REQUESTING PUMP DEACTIVATION!")
-                print("="*60)
-                if self.pump_adapter:
-                    result = self.pump_adapter.deactivate_pump()
-                    print(f"   Deactivation command sent: {'✅ Success' if result else '❌ Failed'}")
-                    print("   Waiting for pump to finish releasing...")
-                    # Note: Printer will be triggered by callback when pump confirms deactivation
-                else:
-                    logger.warning("No pump adapter connected!")
-                    print("⚠️  No pump adapter connected!")
+            data = _loads(message)
+        except ValueError:
+            # Not JSON, just log it
+            return
+        if not isinstance(data, dict):
+            return
+        
+        # Only the keys present in the message are looked at
+        handlers = self._message_handlers
+        for key, value in data.items():
+            handler = handlers.get(key)
+            if handler:
+                handler(value)
+    
+    def _handle_action(self, action):
+        """Pump activation/deactivation requests from Stage 1"""
+        if action == 'activate_pump':
+            logger.info("Stage 1 requesting pump activation")
+            if self.pump_adapter:
+                result = self.pump_adapter.activate_pump()
+                logger.info(f"Pump activation {'succeeded' if result else 'failed'}")
+            else:
+                logger.warning("No pump adapter connected! Check if pump was initialized and linked properly")
+        
+        elif action == 'deactivate_pump':
+            logger.info("Stage 1 requesting pump deactivation")
+            if self.pump_adapter:
+                result = self.pump_adapter.deactivate_pump()
+                # Note: Printer will be triggered by callback when pump confirms deactivation
+                logger.info(f"Pump deactivation command {'sent, waiting for release' if result else 'failed'}")
+            else:
+                logger.warning("No pump adapter connected!")
+    
+    def _handle_button(self, button):
+        """Button press on Stage 1"""
+        if button == 'pressed':
+            logger.info("Button pressed on Stage 1")
+            if self._button_callback:
+                self._button_callback({'button': 'pressed'})
+    
+    def _handle_status(self, status):
+        """Status updates from Stage 1"""
+        if status:
+            logger.info(f"Stage 1 status: {status}")
+            if self._status_callback:
+                self._status_callback({'status': status})
             
-            # Handle button press
-            button = data.get('button', '')
-            if button == 'pressed':
-                print("\n" + "="*60)
-                print("🔘 BUTTON PRESSED ON STAGE 1!")
-                print("="*60)
-                if self._button_callback:
-                    self._button_callback({'button': 'pressed'})
+            # Special handling for game_initiated
+            if status == 'game_initiated':
+                logger.info("Game initiated - SG90 dance complete, waiting for game result")
             
-            # Handle status updates
-            status = data.get('status', '')
-            if status:
-                print(f"   Status: {status}")
-                if self._status_callback:
-                    self._status_callback({'status': status})
+            # Special handling for sequence_complete (WIN finished)
+            if status == 'sequence_complete':
+                if self._receipt_printed:
+                    logger.info("sequence_complete received but receipt already printed - skipping")
+                    return
+                logger.info("Win sequence complete - printing thank you message")
                 
-                # Special handling for game_initiated
-                if status == 'game_initiated':
-                    print("\n" + "="*60)
-                    print("🎮 GAME INITIATED - SG90 dance complete!")
-                    print("   Waiting for game result...")
-                    print("="*60)
-                
-                # Special handling for sequence_complete (WIN finished)
-                if status == 'sequence_complete':
-                    if self._receipt_printed:
-                        logger.info("sequence_complete received but receipt already printed - skipping")
-                        return
-                    print("\n" + "="*60)
-                    print("🏆 WIN SEQUENCE COMPLETE!")
-                    print("🖨️  PRINTING THANK YOU MESSAGE...")
-                    print("="*60)
-                    
-                    # Trigger printer when win sequence is complete
-                    if self.printer_adapter:
-                        result = self._print_receipt_once()
-                        if result:
-                            print("✅ Print job completed!")
-                        else:
-                            print("❌ Print job failed!")
-                    else:
-                        print("⚠️  No printer adapter available")
-            
-            # Handle proximity invite messages
-            invite = data.get('invite', None)
-            if invite is not None:
-                if invite:
-                    print(f"👋 Proximity detected - Showing invite: {invite}")
+                # Trigger printer when win sequence is complete
+                if self.printer_adapter:
+                    result = self._print_receipt_once()
+                    logger.info("Print job queued" if result else "Print job not queued")
                 else:
-                    print("👋 User moved away - Hiding invite")
-                if self._invite_callback:
-                    self._invite_callback({'invite': invite})
-            
-            # Handle relay status
-            relay = data.get('relay', '')
-            if relay:
-                print(f"🔌 Relay status: {relay}")
-                if self._relay_callback:
-                    self._relay_callback({'relay': relay})
-        
-        except json.JSONDecodeError:
-            # Not JSON, just log it
-            pass
+                    logger.warning("No printer adapter available")
+    
+    def _handle_invite(self, invite):
+        """Proximity invite messages (a falsy value hides the invite)"""
+        if invite is not None:
+            if invite:
+                logger.info(f"Proximity detected - showing invite: {invite}")
+            else:
+                logger.info("User moved away - hiding invite")
+            if self._invite_callback:
+                self._invite_callback({'invite': invite})
+    
+    def _handle_relay(self, relay):
+        """Relay status from Stage 1"""
+        if relay:
+            logger.info(f"Relay status: {relay}")
+            if self._relay_callback:
+                self._relay_callback({'relay': relay})
     
     def stop(self):
         """Stop servo controller"""
@@ -318,63 +437,87 @@ class ServoAdapter:
             self.reset_sequence()
         
         if self.serial_connection and self.serial_connection.is_open:
-            self.serial_connection.close()
+            transport, self._transport = self._transport, None
+            if transport is not None:
+                # The transport owns the port and closes it
+                close_transport(self.loop, transport)
+            else:
+                # Wake the reader out of its blocking read()
+                try:
+                    self.serial_connection.cancel_read()
+                except (AttributeError, NotImplementedError):
+                    pass
+                if self._read_thread and self._read_thread is not threading.current_thread():
+                    self._read_thread.join(timeout=1)
+                self.serial_connection.close()
+        
+        # Let the processing thread finish what was already queued
+        self._rx_queue.put(None)
+        if self._process_thread and self._process_thread is not threading.current_thread():
+            self._process_thread.join(timeout=2)
         
         self._initialized = False
         logger.info("Servo adapter stopped")
     
-    def activate_left_motor(self):
+    def _write_cmd(self, cmd: bytes):
         """
-        Activate left motor (servo1 only)
-        Servo1 moves, Servo2 stays neutral for 5 seconds
+        Send one command to Stage 1
+        
+        Threaded reader: written and flushed here, bounded by the port's
+        write_timeout. Asyncio reader: the transport resets write_timeout to
+        0 (non-blocking) when it takes the port over, so the command is
+        handed to transport.write on the loop, which buffers partial writes;
+        a dead transport raises here instead.
+        """
+        transport = self._transport
+        if transport is not None:
+            if transport.is_closing():
+                raise serial.SerialException("Stage 1 serial transport is closed")
+            self.loop.call_soon_threadsafe(transport.write, cmd)
+            return
+        
+        with self._tx_lock:
+            n = self.serial_connection.write(cmd)
+            if n is not None and n < len(cmd):
+                raise serial.SerialTimeoutException(f"Short write: {n} of {len(cmd)} bytes")
+            self.serial_connection.flush()
+    
+    def _send(self, key: str) -> bool:
+        """
+        Send one of the _CMD commands to Stage 1
+        
+        Returns:
+            True if the command was written, False otherwise
         """
         if not self._initialized:
-            logger.warning("Servo adapter not initialized")
-            print("⚠️  Servo adapter not initialized!")
+            logger.warning(f"Servo adapter not initialized - {key} not sent")
             return False
         
         try:
-            self.serial_connection.write(b"LEFT_MOTOR\n")
-            logger.info("Left motor activated")
-            print("📤 Sent command: LEFT_MOTOR to COM4")
+            self._write_cmd(self._CMD[key])
+            logger.info(f"Sent {key} to Stage 1")
             return True
         except Exception as e:
-            logger.error(f"Error activating left motor: {e}")
-            print(f"❌ Error: {e}")
+            logger.error(f"Failed to send {key} command: {e}")
             return False
     
+    def activate_left_motor(self):
+        """
+        Activate left motor (servo1 only)
+        Servo1 moves, Servo2 stays neutral for 5 seconds
+        """
+        return self._send('LEFT')
+    
     def activate_right_motor(self):
         """
         Activate right motor (servo2 only)
         Servo1 stays neutral, Servo2 moves for 5 seconds
         """
-        if not self._initialized:
-            logger.warning("Servo adapter not initialized")
-            print("⚠️  Servo adapter not initialized!")
-            return False
-        
-        try:
-            self.serial_connection.write(b"RIGHT_MOTOR\n")
-            logger.info("Right motor activated")
-            print("📤 Sent command: RIGHT_MOTOR to COM4")
-            return True
-        except Exception as e:
-            logger.error(f"Error activating right motor: {e}")
-            print(f"❌ Error: {e}")
-            return False
+        return self._send('RIGHT')
     
     def stop_motors(self):
         """Stop all motors immediately"""
-        if not self._initialized:
-            return False
-        
-        try:
-            self.serial_connection.write(b"STOP\n")
-            logger.info("Motors stopped")
-            return True
-        except Exception as e:
-            logger.error(f"Error stopping motors: {e}")
-            return False
+        return self._send('STOP')
     
     def activate_motor_by_score(self, score: int):
         """
@@ -385,114 +528,53 @@ class ServoAdapter:
                 < 10: User lost - send LOSE command
                 >= 10: User won - send WIN command to trigger full sequence
         """
-        print("\n" + "="*60)
-        print(f"🤖 GAME RESULT - SCORE: {score}")
-        print("="*60)
+        logger.info(f"Game result - score: {score}")
         
         if not self._initialized:
             logger.error("Servo adapter not initialized! Cannot send command.")
-            print("❌ ERROR: Servo adapter not initialized!")
             return False
         
         if not self.serial_connection or not self.serial_connection.is_open:
             logger.error("Serial connection not open! Cannot send command.")
-            print("❌ ERROR: Serial connection not open!")
             return False
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         if score < 10:
-            print(f"😢 Score {score} < 10: USER LOST")
-            print(f"🕐 Timestamp: {timestamp}")
-            
             # Get GPT-generated poem from last game receipt
             gpt_poem = ""
             if self._last_game_receipt and 'poem' in self._last_game_receipt:
                 gpt_poem = self._last_game_receipt['poem']
             
-            # Display poem (GPT-generated or fallback)
-            if gpt_poem:
-                print("\n" + "="*60)
-                print("📜 POEMA DE LA RESILIENCIA")
-                print("="*60)
-                print()
-                print(gpt_poem)
-                print()
-                print(f"  Tu puntaje: {score} puntos")
-                print("  ¡Inténtalo de nuevo! 💪")
-                print()
-                print("="*60 + "\n")
-            else:
-                # Fallback if GPT poem not available
-                print("\n" + "="*60)
-                print("📜 POEMA DE LA RESILIENCIA")
-                print("="*60)
-                print()
-                print("  Caer no es el final, es solo un paso,")
-                print("  cada intento te acerca al éxito acaso.")
-                print()
-                print(f"  Tu puntaje: {score} puntos")
-                print("  ¡Inténtalo de nuevo! 💪")
-                print()
-                print("="*60 + "\n")
+            # Log poem (GPT-generated or fallback)
+            logger.info(
+                "Score %s < 10: user lost at %s\nPOEMA DE LA RESILIENCIA\n%s\nTu puntaje: %s puntos",
+                score, timestamp,
+                gpt_poem or "Caer no es el final, es solo un paso,\ncada intento te acerca al éxito acaso.",
+                score
+            )
             
             # Print poem on thermal printer
             if self.printer_adapter and gpt_poem:
                 poem_text = f"Timestamp: {timestamp}\n\n{gpt_poem}\n\nTu puntaje: {score} puntos\nIntentalo de nuevo!"
                 print("🖨️  Imprimiendo poema de resiliencia...")
-                result = self.printer_adapter.print_thank_you(score=score, poem=poem_text)
-                if result:
-                    print("✅ Poema impreso en impresora térmica!")
-                else:
-                    print("❌ Error al imprimir poema")
+                self.printer_adapter.print_thank_you(
+                    score=score, poem=poem_text, on_done=self._on_poem_printed
+                )
             else:
-                print("⚠️  No hay impresora térmica conectada o poema no disponible")
+                logger.warning("No thermal printer connected or poem not available")
             
             logger.info(f"Score {score} < 10: Sending LOSE command at {timestamp}")
-            try:
-                self.serial_connection.write(b"LOSE\n")
-                self.serial_connection.flush()
-                print("📤 Sent: LOSE to Stage 1")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send LOSE command: {e}")
-                print(f"❌ Error sending LOSE: {e}")
-                return False
+            return self._send('LOSE')
         else:
-            print(f"🏆 Score {score} >= 300: USER WON!")
-            print(f"🕐 Timestamp: {timestamp}")
-            print(f"🎯 Puntaje obtenido: {score} puntos")
-            print("   Triggering full win sequence:")
-            print("   → 360° servo dance")
-            print("   → Arm pick down")
-            print("   → Suction pump activation")
-            print("   → Arm lift with object")
-            print("   → Release")
+            # Full win sequence: 360° servo dance, arm pick down, suction
+            # pump activation, arm lift with object, release
             logger.info(f"Score {score} >= 300: Sending WIN command to Stage 1 at {timestamp}")
-            try:
-                self.serial_connection.write(b"WIN\n")
-                self.serial_connection.flush()
-                print("📤 Sent: WIN to Stage 1")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send WIN command: {e}")
-                print(f"❌ Error sending WIN: {e}")
-                return False
+            return self._send('WIN')
     
     def reset_sequence(self):
         """Reset Stage 1 Arduino to idle state"""
-        if not self._initialized:
-            return False
-        
-        try:
-            self.serial_connection.write(b"RESET\n")
-            self.serial_connection.flush()
-            logger.info("Reset command sent to Stage 1")
-            print("📤 Sent: RESET to Stage 1")
-            return True
-        except Exception as e:
-            logger.error(f"Error sending reset: {e}")
-            return False
+        return self._send('RESET')
     
     def _gate_sequence(self):
         """
@@ -500,26 +582,11 @@ class ServoAdapter:
         1. Move servo1 one direction for 5 seconds (open gate)
         2. Stop for 2 seconds (gate stays open)
         3. Move servo1 opposite direction for 5 seconds (close gate)
-        """
-        if not self._initialized:
-            logger.warning("Servo adapter not initialized for gate sequence")
-            return False
         
-        try:
-            print("\n" + "="*60)
-            print("🚪 GATE SEQUENCE STARTED - USER WON!")
-            print("="*60)
-            
-            # Delegate timing to Arduino for smooth movement on continuous-rotation servo
-            print("\n▶️  Running gate sequence on Arduino (5s left slow, 2s stop, 5s right slow)...")
-            logger.info("Gate sequence: Delegating to Arduino via GATE_SEQUENCE")
-            self.serial_connection.write(b"GATE_SEQUENCE\n")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error in gate sequence: {e}")
-            print(f"❌ Gate sequence error: {e}")
-            return False
+        Timing is delegated to the Arduino (5s left slow, 2s stop, 5s right
+        slow) for smooth movement on the continuous-rotation servo.
+        """
+        return self._send('GATE')
     
     def _auto_detect_port(self) -> Optional[str]:
         """
@@ -531,21 +598,23 @@ class ServoAdapter:
         logger.info("Auto-detecting servo Arduino port...")
         ports = serial.tools.list_ports.comports()
         
+        # One pass: COM3 is preferred for the servo controller, otherwise
+        # the first Arduino-like device wins
+        first_match = None
         for port in ports:
             logger.debug(f"Found port: {port.device} - {port.description}")
             
             # Look for Arduino-like devices
-            if any(keyword in port.description.lower() for keyword in ['arduino', 'ch340', 'usb serial']):
-                # Prefer COM3 for servo controller
+            if _ARDUINO_RE.search(port.description) is not None:
                 if port.device == "COM3":
-                    logger.info(f"Servo Arduino found on COM3")
+                    logger.info("Servo Arduino found on COM3")
                     return port.device
+                if first_match is None:
+                    first_match = port.device
         
-        # If COM3 not found, return first Arduino-like device
-        for port in ports:
-            if any(keyword in port.description.lower() for keyword in ['arduino', 'ch340', 'usb serial']):
-                logger.info(f"Potential servo Arduino found: {port.device}")
-                return port.device
+        if first_match:
+            logger.info(f"Potential servo Arduino found: {first_match}")
+            return first_match
         
         logger.warning("No servo Arduino port auto-detected")
         return None
@@ -3,9 +3,14 @@ Thermal Printer Output Adapter
 Prints thank you messages via Windows printer API
 """
 import logging
+import queue
+import re
 import serial
 import serial.tools.list_ports
-from typing import Optional
+import threading
+from typing import Callable, Optional
+
+from src.adapters.serial_open import set_low_latency
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +22,33 @@ except ImportError:
     WIN32_AVAILABLE = False
     logger.warning("win32print not available - install with: pip install pywin32")
 
+# Port descriptions that look like a serial receipt printer (auto-detect)
+_PRINTER_RE = re.compile(r'printer|thermal|pos|usb-serial|ch340', re.I)
+
+# ESC/POS commands
+_ESC = b'\x1b'
+_GS = b'\x1d'
+
+_INIT = _ESC + b'@'  # Initialize printer
+_CENTER = _ESC + b'a\x01'  # Center align
+_BOLD_ON = _ESC + b'E\x01'
+_BOLD_OFF = _ESC + b'E\x00'
+_DOUBLE_ON = _GS + b'!\x11'  # Double height and width
+_DOUBLE_OFF = _GS + b'!\x00'
+_CUT = _GS + b'V\x00'  # Full cut
+
+# Fixed parts of the thank-you receipt, encoded once
+_STATIC_HEADER = (
+    _INIT + _CENTER
+    + _DOUBLE_ON + _BOLD_ON + b'\nIOIO\n' + _DOUBLE_OFF + _BOLD_OFF
+    + b'\n' + 'Gracias por jugar\ncon nosotros\n\n'.encode('cp437')
+)
+_STATIC_FOOTER = (
+    'Atentamente,\n'.encode('cp437')
+    + _BOLD_ON + b'IOIO\n' + _BOLD_OFF + b'\n\n\n'
+    + _CUT
+)
+
 
 class ThermalPrinterAdapter:
     """
@@ -39,6 +71,13 @@ class ThermalPrinterAdapter:
         self.auto_detect = auto_detect
         self.exclude_ports = exclude_ports or []
         self._initialized = False
+        self._ser: Optional[serial.Serial] = None  # Held open between prints
+        self._write_lock = threading.Lock()
+        
+        # Prints run on a worker thread; one pending job at most, so repeated
+        # triggers while a receipt is going out are dropped
+        self._print_queue = queue.Queue(maxsize=1)
+        self._print_thread: Optional[threading.Thread] = None
         
         logger.info(f"Thermal Printer Adapter initialized (port: {port or 'auto-detect'}, exclude: {self.exclude_ports})")
     
@@ -57,11 +96,15 @@ class ThermalPrinterAdapter:
                     logger.warning("Could not auto-detect thermal printer port")
                     return False
             
-            # Test connection
-            with serial.Serial(self.port, self.baud_rate, timeout=2) as ser:
+            # Open once and keep the port for every print
+            with self._write_lock:
+                self._close_port()
+                self._ser = serial.Serial(self.port, self.baud_rate, timeout=2, write_timeout=5)
+                set_low_latency(self._ser)
                 logger.info(f"Thermal printer connection test successful on {self.port}")
             
             self._initialized = True
+            self._start_worker()
             logger.info(f"Thermal printer initialized on {self.port}")
             return True
             
@@ -91,8 +134,7 @@ class ThermalPrinterAdapter:
                     logger.info(f"Skipping {port.device} (excluded)")
                     continue
                 
-                desc = port.description.lower()
-                if any(keyword in desc for keyword in ['printer', 'thermal', 'pos', 'usb-serial', 'ch340']):
+                if _PRINTER_RE.search(port.description) is not None:
                     logger.info(f"Auto-detected printer on {port.device}: {port.description}")
                     return port.device
             
@@ -103,9 +145,58 @@ class ThermalPrinterAdapter:
             logger.error(f"Error during auto-detection: {e}")
             return None
     
-    def print_thank_you(self, score: Optional[int] = None, ascii_line: Optional[str] = None, poem: Optional[str] = None) -> bool:
+    def print_thank_you(
+        self,
+        score: Optional[int] = None,
+        ascii_line: Optional[str] = None,
+        poem: Optional[str] = None,
+        on_done: Optional[Callable[[bool], None]] = None
+    ) -> bool:
         """
-        Print thank you message
+        Queue a thank you message for the print worker
+        
+        Returns immediately; printing (and opening the port if needed)
+        happens on the worker thread, so a serial reader or callback thread
+        calling this is never held up by the printer.
+        
+        Args:
+            on_done: Called on the worker with True/False once the receipt
+                     has been printed (or has failed)
+        
+        Returns:
+            True if the job was queued, False if another one is already pending
+        """
+        self._start_worker()
+        try:
+            self._print_queue.put_nowait(({'score': score, 'ascii_line': ascii_line, 'poem': poem}, on_done))
+        except queue.Full:
+            logger.info("Print job already pending - skipping duplicate")
+            return False
+        return True
+    
+    def _start_worker(self):
+        """Start the print worker thread unless it is already running"""
+        if self._print_thread is None or not self._print_thread.is_alive():
+            self._print_thread = threading.Thread(target=self._print_loop, name="printer", daemon=True)
+            self._print_thread.start()
+    
+    def _print_loop(self):
+        """Print worker: runs queued jobs until it gets None"""
+        while True:
+            job = self._print_queue.get()
+            if job is None:
+                break
+            kwargs, on_done = job
+            ok = self._do_print(**kwargs)
+            if on_done:
+                try:
+                    on_done(ok)
+                except Exception as e:
+                    logger.error(f"Error in print completion callback: {e}")
+    
+    def _do_print(self, score: Optional[int] = None, ascii_line: Optional[str] = None, poem: Optional[str] = None) -> bool:
+        """
+        Print thank you message (runs on the print worker)
         
         Returns:
             True if successful, False otherwise
@@ -125,54 +216,27 @@ class ThermalPrinterAdapter:
             print("🖨️  PRINTING THANK YOU MESSAGE")
             print("="*60)
             
-            # ESC/POS commands
-            ESC = b'\x1b'
-            GS = b'\x1d'
+            # Whole receipt in one buffer: one write instead of one per
+            # command, and the mode changes reach the printer together
+            buf = bytearray(_STATIC_HEADER)
             
-            INIT = ESC + b'@'  # Initialize printer
-            CENTER = ESC + b'a\x01'  # Center align
-            BOLD_ON = ESC + b'E\x01'
-            BOLD_OFF = ESC + b'E\x00'
-            DOUBLE_ON = GS + b'!\x11'  # Double height and width
-            DOUBLE_OFF = GS + b'!\x00'
-            CUT = GS + b'V\x00'  # Full cut
+            # Dynamic lines are joined and encoded in one go
+            parts = []
+            if score is not None:
+                parts.append(f'Puntaje: {score}\n')
+            if ascii_line:
+                parts.append(f'{ascii_line}\n')
+            if poem:
+                parts.append(f'{poem}\n')
+            if parts:
+                parts.append('\n')
+                buf += ''.join(parts).encode('cp437', errors='replace')
             
-            with serial.Serial(self.port, self.baud_rate, timeout=2) as ser:
-                # Initialize
-                ser.write(INIT)
-                
-                # Center align
-                ser.write(CENTER)
-                
-                # Big title
-                ser.write(DOUBLE_ON)
-                ser.write(BOLD_ON)
-                ser.write(b'\nIOIO\n')
-                ser.write(DOUBLE_OFF)
-                ser.write(BOLD_OFF)
-                
-                # Message
-                ser.write(b'\n')
-                ser.write('Gracias por jugar\n'.encode('cp437'))
-                ser.write('con nosotros\n'.encode('cp437'))
-                ser.write(b'\n')
-
-                if score is not None:
-                    ser.write((f'Puntaje: {score}\n').encode('cp437', errors='replace'))
-                if ascii_line:
-                    ser.write((f'{ascii_line}\n').encode('cp437', errors='replace'))
-                if poem:
-                    ser.write((f'{poem}\n').encode('cp437', errors='replace'))
-                if score is not None or ascii_line or poem:
-                    ser.write(b'\n')
-                ser.write('Atentamente,\n'.encode('cp437'))
-                ser.write(BOLD_ON)
-                ser.write(b'IOIO\n')
-                ser.write(BOLD_OFF)
-                ser.write(b'\n\n\n')
-                
-                # Cut paper
-                ser.write(CUT)
+            buf += _STATIC_FOOTER
+            
+            with self._write_lock:
+                self._ser.write(bytes(buf))
+                self._ser.flush()
             
             logger.info("Thank you message printed successfully!")
             print("✅ Thank you message printed!")
@@ -180,6 +244,8 @@ class ThermalPrinterAdapter:
             
         except serial.SerialException as e:
             logger.error(f"Serial error while printing: {e}")
+            # Reopen the port on the next print
+            self._initialized = False
             print(f"❌ Printer error: {e}")
             return False
         except Exception as e:
@@ -190,9 +256,30 @@ class ThermalPrinterAdapter:
     def stop(self):
         """Stop thermal printer adapter"""
         logger.info("Stopping thermal printer adapter...")
+        
+        # A receipt that is already queued still gets printed
+        worker, self._print_thread = self._print_thread, None
+        if worker is not None and worker.is_alive():
+            try:
+                self._print_queue.put(None, timeout=5)
+            except queue.Full:
+                pass
+            worker.join(timeout=10)
+        
         self._initialized = False
+        with self._write_lock:
+            self._close_port()
         logger.info("Thermal printer adapter stopped")
     
+    def _close_port(self):
+        """Close the held port, if any (caller holds _write_lock)"""
+        ser, self._ser = self._ser, None
+        if ser is not None and ser.is_open:
+            try:
+                ser.close()
+            except serial.SerialException:
+                pass
+    
     def get_printer_info(self) -> dict:
         """Get printer adapter information"""
         return {
@@ -4,7 +4,7 @@ Prints thank you messages via Windows printer API
 Uses the same method as test_printer_simple.py
 """
 import logging
-from typing import Optional
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -111,13 +111,29 @@ class ThermalPrinterAdapter:
             logger.error(f"Error during printer detection: {e}")
             return None
     
-    def print_thank_you(self, score: Optional[int] = None, ascii_line: Optional[str] = None, poem: Optional[str] = None) -> bool:
+    def print_thank_you(
+        self,
+        score: Optional[int] = None,
+        ascii_line: Optional[str] = None,
+        poem: Optional[str] = None,
+        on_done: Optional[Callable[[bool], None]] = None
+    ) -> bool:
         """
         Print thank you message using Windows printer API
         
+        Args:
+            on_done: Called with the result before returning (same
+                     interface as the queued serial printer adapter)
+        
         Returns:
             True if successful, False otherwise
         """
+        ok = self._print_thank_you(score, ascii_line, poem)
+        if on_done:
+            on_done(ok)
+        return ok
+    
+    def _print_thank_you(self, score: Optional[int], ascii_line: Optional[str], poem: Optional[str]) -> bool:
         if not WIN32_AVAILABLE:
             logger.error("win32print not available")
             print("❌ win32print not installed")
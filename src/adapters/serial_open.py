@@ -0,0 +1,77 @@
+"""
+Serial Port Opening
+Opens Arduino ports without rebooting the board
+
+A normal open raises DTR, and Uno/Nano-style boards wire that edge to their
+reset pin, so every adapter used to sleep 2s afterwards while the
+bootloader ran. Holding DTR (and RTS, which ESP32 boards use for EN) low
+from the start leaves the running sketch alone and the port is usable
+immediately.
+
+set_low_latency() shortens how long received bytes sit in the USB-serial
+bridge and the driver before a read returns them.
+"""
+import logging
+import sys
+
+import serial
+
+logger = logging.getLogger(__name__)
+
+
+def open_without_reset(port: str, baudrate: int, **kwargs) -> serial.Serial:
+    """
+    Open port with the modem control lines held low
+
+    Args:
+        port: Serial port (e.g., "COM7")
+        baudrate: Baud rate
+        **kwargs: Any other serial.Serial settings (timeout, ...)
+
+    Returns:
+        Open serial.Serial
+    """
+    # Created without a port so nothing is opened until DTR/RTS are set
+    ser = serial.Serial(None, baudrate, **kwargs)
+    ser.port = port
+    ser.dtr = False
+    ser.rts = False
+    ser.open()
+    return ser
+
+
+def set_low_latency(ser: serial.Serial):
+    """
+    Make reads on an open port return received bytes as soon as possible
+
+    Linux: sets ASYNC_LOW_LATENCY so FTDI-style bridges skip their 16ms
+    latency timer. Windows: ReadIntervalTimeout and
+    ReadTotalTimeoutMultiplier of MAXDWORD make ReadFile return as soon as
+    any byte is buffered, still waiting up to the port timeout for the
+    first one (this replaces any inter_byte_timeout on Windows). pyserial
+    rewrites the COMMTIMEOUTS whenever timeout changes, so call this after
+    the final timeout is set.
+
+    Args:
+        ser: Open serial.Serial
+    """
+    try:
+        ser.set_low_latency_mode(True)
+    except (AttributeError, NotImplementedError, OSError, ValueError):
+        logger.debug("Low latency mode not supported on %s", ser.port)
+    
+    if sys.platform != 'win32' or not ser.timeout:
+        return
+    
+    import ctypes
+    from serial import win32
+    
+    timeouts = win32.COMMTIMEOUTS()
+    if not win32.GetCommTimeouts(ser._port_handle, ctypes.byref(timeouts)):
+        return
+    timeouts.ReadIntervalTimeout = win32.MAXDWORD
+    timeouts.ReadTotalTimeoutMultiplier = win32.MAXDWORD
+    # MAXDWORD itself would mean "no timeout"
+    timeouts.ReadTotalTimeoutConstant = min(max(1, int(ser.timeout * 1000)), win32.MAXDWORD - 1)
+    if not win32.SetCommTimeouts(ser._port_handle, ctypes.byref(timeouts)):
+        logger.debug("SetCommTimeouts failed on %s", ser.port)
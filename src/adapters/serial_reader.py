@@ -0,0 +1,59 @@
+"""
+Threaded Serial Line Reader
+pyserial's serial.threaded.ReaderThread with a line splitter for the adapters
+
+Used when no shared event loop is available (see async_serial). The reader
+thread sleeps in a blocking read() and hands every complete line to the
+adapter as stripped bytes, ready for orjson.
+"""
+import logging
+from typing import Callable, Optional
+
+from serial.threaded import Packetizer, ReaderThread
+
+logger = logging.getLogger(__name__)
+
+
+class SerialLinePacketizer(Packetizer):
+    """Splits the byte stream on newlines and forwards non-empty lines"""
+
+    TERMINATOR = b'\n'
+
+    def __init__(
+        self,
+        handle_line: Callable[[bytes], None],
+        on_lost: Optional[Callable[[Optional[Exception]], None]] = None
+    ):
+        super().__init__()
+        self._handle_line = handle_line
+        self._on_lost = on_lost
+
+    def handle_packet(self, packet):
+        line = bytes(packet).strip()
+        if line:
+            # An exception escaping here would end the ReaderThread
+            try:
+                self._handle_line(line)
+            except Exception as e:
+                logger.error(f"Error handling serial line: {e}")
+
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        if self._on_lost:
+            self._on_lost(exc)
+
+
+def start_line_reader(
+    serial_instance,
+    handle_line: Callable[[bytes], None],
+    on_lost: Optional[Callable[[Optional[Exception]], None]] = None
+) -> ReaderThread:
+    """
+    Start a ReaderThread delivering lines from an open serial.Serial
+
+    Stop it with reader.close(), which also closes the port.
+    """
+    reader = ReaderThread(serial_instance, lambda: SerialLinePacketizer(handle_line, on_lost))
+    reader.start()
+    reader.connect()
+    return reader
@@ -5,13 +5,18 @@ This is where all the pieces come together
 import logging
 import os
 import random
+import threading
 import urllib.request
 import urllib.error
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from src.adapters.async_serial import SERIAL_ASYNCIO_AVAILABLE, get_serial_loop, start_loop_thread
+from src.adapters.input import _list_ports
 from src.adapters.input.arduino_adapter import ArduinoAdapter
 from src.adapters.input.button_adapter import ButtonAdapter
+from src.adapters.input.serial_multiplexer import SerialMultiplexer
 from src.adapters.output.local_audio_adapter import LocalAudioAdapter
 from src.adapters.output.servo_adapter import ServoAdapter
 from src.adapters.output.pump_adapter import PumpAdapter
@@ -72,12 +77,30 @@ class MusicMachineApplication:
         self.input_adapter = input_adapter  # Optional, can be None
         self.output_adapter = output_adapter or LocalAudioAdapter()
         
+        # Serial adapters share one event loop thread when pyserial-asyncio
+        # is installed (None means one thread per adapter)
+        self.serial_loop = get_serial_loop() if SERIAL_ASYNCIO_AVAILABLE else None
+        
+        # Input event callbacks (prints, socketio emits) run on a loop of
+        # their own, so slow handlers never hold up the serial ports
+        self.event_loop = start_loop_thread("app-events")
+        
         # Button adapter (optional) - DISABLED when using Stage 1 servo adapter
         # Stage 1 Arduino handles button internally and sends events via serial
         self.button_adapter = None
+        self.serial_multiplexer = None
         if enable_button and not enable_servo:
-            # Only enable separate button adapter if servo is not enabled
-            self.button_adapter = ButtonAdapter(port="COM7", auto_detect=True)
+            # Only enable separate button adapter if servo is not enabled.
+            # COM7 is read once and shared with any other adapter on it.
+            self.serial_multiplexer = SerialMultiplexer("COM7", loop=self.serial_loop)
+            self.button_adapter = ButtonAdapter(
+                port="COM7", auto_detect=True, multiplexer=self.serial_multiplexer
+            )
+            
+            # A proximity sensor wired to the same board shares the reader
+            if (getattr(self.input_adapter, "port", None) == "COM7"
+                    and getattr(self.input_adapter, "multiplexer", False) is None):
+                self.input_adapter.multiplexer = self.serial_multiplexer
             logger.info("Button adapter enabled (preferred port COM7, auto-detect ON)")
         elif enable_button and enable_servo:
             logger.info("Button adapter SKIPPED - Stage 1 servo adapter handles button on COM7")
@@ -85,13 +108,13 @@ class MusicMachineApplication:
         # Servo adapter (Stage 1 - COM7) - handles button, SG90, 360° servo, arm
         self.servo_adapter = None
         if enable_servo:
-            self.servo_adapter = ServoAdapter(port="COM7", auto_detect=False)
+            self.servo_adapter = ServoAdapter(port="COM7", auto_detect=False, loop=self.serial_loop)
             logger.info("Servo adapter (Stage 1) enabled on COM7")
         
         # Pump adapter (Stage 2 - COM4)
         self.pump_adapter = None
         if enable_pump:
-            self.pump_adapter = PumpAdapter(port="COM4")
+            self.pump_adapter = PumpAdapter(port="COM4", loop=self.serial_loop)
             logger.info("Pump adapter (Stage 2) enabled on COM4")
         
         # Thermal printer adapter (Windows printer API)
@@ -121,8 +144,14 @@ class MusicMachineApplication:
         
         self._running = False
         
+        # Set by stop() so a foreground thread can wait for shutdown
+        # without polling is_running()
+        self.shutdown_event = threading.Event()
+        
     def start(self):
         """Start the music machine"""
+        self.shutdown_event.clear()
+        
         logger.info("=" * 60)
         logger.info("Starting Music Machine")
         logger.info("=" * 60)
@@ -151,12 +180,42 @@ class MusicMachineApplication:
                 import time
                 time.sleep(0.5)
             
-            # Initialize pump adapter if enabled (Stage 2 - COM4)
+            # Bring up the remaining serial devices in parallel - each one
+            # spends up to 2s waiting for its Arduino to reset
+            startup = {}
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="adapter-start") as pool:
+                # Initialize pump adapter if enabled (Stage 2 - COM4)
+                if self.pump_adapter:
+                    logger.info("Initializing pump controller (Stage 2 - COM4)...")
+                    print("💨 Initializing pump controller on COM4...")
+                    startup['pump'] = pool.submit(self.pump_adapter.initialize)
+                
+                # Initialize servo adapter if enabled (Stage 1 - COM7)
+                if self.servo_adapter:
+                    logger.info("Initializing servo controller (Stage 1 - COM7)...")
+                    print("🤖 Initializing servo controller on COM7...")
+                    startup['servo'] = pool.submit(self.servo_adapter.initialize)
+                
+                # Start proximity sensor input adapter if provided
+                if self.input_adapter:
+                    logger.info("Starting proximity sensor input adapter...")
+                    if isinstance(self.input_adapter, ArduinoAdapter):
+                        self.input_adapter.register_callback(self._handle_input_event, loop=self.event_loop)
+                    else:
+                        self.input_adapter.register_callback(self._handle_input_event)
+                    startup['input'] = pool.submit(self.input_adapter.start)
+                
+                # Start button adapter if enabled
+                if self.button_adapter:
+                    logger.info("Starting button controller...")
+                    logger.info(f"[APP] Registering button callback: {self._handle_button_event}")
+                    self.button_adapter.register_callback(self._handle_button_event, loop=self.event_loop)
+                    logger.info("[APP] Button callback registered successfully")
+                    startup['button'] = pool.submit(self.button_adapter.start)
+            
             pump_initialized = False
             if self.pump_adapter:
-                logger.info("Initializing pump controller (Stage 2 - COM4)...")
-                print("💨 Initializing pump controller on COM4...")
-                if not self.pump_adapter.initialize():
+                if not startup['pump'].result():
                     logger.warning("Failed to initialize pump controller")
                     print("⚠️  Failed to initialize pump controller on COM4")
                 else:
@@ -164,11 +223,8 @@ class MusicMachineApplication:
                     logger.info(f"Pump info: {self.pump_adapter.get_output_info()}")
                     print(f"✅ Pump controller initialized: {self.pump_adapter.get_output_info()}")
             
-            # Initialize servo adapter if enabled (Stage 1 - COM7)
             if self.servo_adapter:
-                logger.info("Initializing servo controller (Stage 1 - COM7)...")
-                print("🤖 Initializing servo controller on COM7...")
-                if not self.servo_adapter.initialize():
+                if not startup['servo'].result():
                     logger.warning("Failed to initialize servo controller")
                     print("⚠️  Failed to initialize servo controller on COM7")
                 else:
@@ -197,20 +253,13 @@ class MusicMachineApplication:
                 self.servo_adapter.register_invite_callback(self._handle_proximity_invite)
                 logger.info("Proximity invite callback registered with servo adapter")
             
-            # Start proximity sensor input adapter if provided
+            # Re-raise start() failures of the input adapters
             if self.input_adapter:
-                logger.info("Starting proximity sensor input adapter...")
-                self.input_adapter.register_callback(self._handle_input_event)
-                self.input_adapter.start()
+                startup['input'].result()
                 logger.info(f"Input adapter info: {self.input_adapter.get_sensor_info()}")
             
-            # Start button adapter if enabled
             if self.button_adapter:
-                logger.info("Starting button controller...")
-                logger.info(f"[APP] Registering button callback: {self._handle_button_event}")
-                self.button_adapter.register_callback(self._handle_button_event)
-                logger.info("[APP] Button callback registered successfully")
-                self.button_adapter.start()
+                startup['button'].result()
                 logger.info(f"Button info: {self.button_adapter.get_sensor_info()}")
             
             # Register game callbacks with visualizer
@@ -240,6 +289,9 @@ class MusicMachineApplication:
             logger.error(f"Failed to start application: {e}")
             self.stop()
             raise
+        finally:
+            # Auto-detection is over; later lookups should see hot-plugged ports
+            _list_ports.cache_clear()
     
     def stop(self):
         """Stop the music machine"""
@@ -259,6 +311,12 @@ class MusicMachineApplication:
         except Exception as e:
             logger.error(f"Error stopping button adapter: {e}")
         
+        try:
+            if self.serial_multiplexer:
+                self.serial_multiplexer.stop()
+        except Exception as e:
+            logger.error(f"Error stopping serial multiplexer: {e}")
+        
         try:
             if self.output_adapter:
                 self.output_adapter.stop()
@@ -283,6 +341,7 @@ class MusicMachineApplication:
         except Exception as e:
             logger.error(f"Error stopping printer adapter: {e}")
         
+        self.shutdown_event.set()
         logger.info("Music Machine stopped")
     
     def is_running(self) -> bool:
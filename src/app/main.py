@@ -7,17 +7,8 @@ import sys
 import time
 import signal
 from pathlib import Path
-import os
 
-# Add src to path
-src_path = str(Path(__file__).parent.parent)
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
-# Change to src directory for relative imports
-os.chdir(src_path)
-
-from app.application import MusicMachineApplication
+from src.app.application import MusicMachineApplication
 
 # Configure logging
 logging.basicConfig(
@@ -25,7 +16,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('music_machine.log')
+        logging.FileHandler(Path(__file__).parent.parent / 'music_machine.log')
     ]
 )
 
@@ -2,14 +2,9 @@
 Test Thermal Printer Integration
 Tests the printer adapter in the context of the application
 """
-import sys
-from pathlib import Path
+import threading
 
-# Add src to Python path
-src_path = Path(__file__).parent / "src"
-sys.path.insert(0, str(src_path))
-
-from adapters.output.thermal_printer_adapter import ThermalPrinterAdapter
+from src.adapters.output.thermal_printer_adapter import ThermalPrinterAdapter
 
 def main():
     print("="*60)
@@ -36,7 +31,19 @@ def main():
     print("\n3. Printing thank you message...")
     input("Press ENTER to print...")
     
-    if printer.print_thank_you():
+    # Printing happens on the adapter's worker thread; wait for its result
+    done = threading.Event()
+    result = []
+    
+    def on_done(ok):
+        result.append(ok)
+        done.set()
+    
+    if not printer.print_thank_you(on_done=on_done):
+        print("\n❌ Failed to queue print job")
+    elif not done.wait(timeout=30):
+        print("\n❌ Print job timed out")
+    elif result[0]:
         print("\n✅ SUCCESS! Check your printer for the thank you message.")
     else:
         print("\n❌ Failed to print message")